@@ -0,0 +1,64 @@
+"""asyncio driver for RRig.BuildDriver, kept apart so the rest of the package still imports on python 2."""
+import asyncio
+
+
+async def runAsync(driver, delay=0.0):  # type: (RRig.BuildDriver, float) -> RRig.BuildDriver
+    # one tick per loop iteration, other tasks run in between
+    while not driver.tick():
+        await asyncio.sleep(delay)
+    return driver
+
+
+def test():
+    """Build the benchmark rig on the fake backend from an asyncio loop, next to another task, then cancel one."""
+    from . import RBench, RFakeScene, RRig
+    from .RScene import cmds
+
+    fakeCmds = RFakeScene.FakeCmds()
+    cmds.setModule(fakeCmds)
+    try:
+        events = list()
+
+        async def watcher(driver):
+            # scene edits between ticks are the user's: no journal, no build undo chunk
+            while not driver.done:
+                events.append(('watch', driver.rig.transaction is not None and driver.rig.transaction.paused))
+                fakeCmds.spaceLocator(name='userLocator#')
+                await asyncio.sleep(0)
+
+        rig = RBench.sampleRig()
+        driver = RRig.BuildDriver(rig, budget=0.0, onProgress=lambda progress: events.append(('step', progress.step)))
+
+        async def main():
+            await asyncio.gather(runAsync(driver), watcher(driver))
+
+        asyncio.run(main())
+
+        steps = [value for kind, value in events if kind == 'step']
+        assert driver.done and not driver.cancelled and driver.error is None
+        assert steps == list(range(1, steps[-1] + 1)), steps
+        assert all(paused for kind, paused in events[1:] if kind == 'watch'), 'watcher ran inside the transaction'
+        assert [kind for kind, _ in events].count('watch') > 1, 'the build did not yield to other tasks'
+        assert rig.rigIndex is not None and cmds.objExists(rig.folder)
+
+        # cancelling rolls back the build, and only the build
+        cmds.file(new=True, force=True)
+        rig = RBench.sampleRig()
+        driver = RRig.BuildDriver(rig, budget=0.0)
+
+        async def cancelSoon():
+            for _ in range(5):
+                fakeCmds.spaceLocator(name='userLocator#')
+                await asyncio.sleep(0)
+            driver.cancel()
+
+        async def mainCancel():
+            await asyncio.gather(runAsync(driver), cancelSoon())
+
+        asyncio.run(mainCancel())
+
+        remaining = cmds.ls()
+        assert driver.cancelled and rig.folder is None
+        assert remaining and all(node.startswith('userLocator') for node in remaining), remaining
+    finally:
+        cmds.setModule(None)
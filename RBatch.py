@@ -0,0 +1,135 @@
+import collections
+import multiprocessing
+import os
+import time
+import traceback
+
+from . import RScene
+
+backends = ('maya', 'fake')
+
+
+def initializeWorker(backend):  # type: (str) -> None
+    if backend == 'maya':
+        import maya.standalone
+        maya.standalone.initialize(name='python')
+    elif backend == 'fake':
+        from . import RFakeScene
+        RScene.cmds.setModule(RFakeScene.FakeCmds())
+    else:
+        raise ValueError('Unrecognized backend -> {}'.format(backend))
+
+
+def buildJob(job):  # type: (dict) -> dict
+    """Build one serialized rig in a fresh scene. Never raises, failures are reported in the result."""
+    from . import RRig
+
+    cmds = RScene.cmds
+    result = dict(job, output=None, error=None, seconds=0.0, pid=os.getpid())
+
+    start = time.time()
+    try:
+        cmds.file(new=True, force=True)
+        rig = RRig.RRig.load(job['path'])
+        rig.create()
+
+        if job['outputDir']:
+            output = os.path.join(job['outputDir'], '{}.ma'.format(job['name']))
+            cmds.file(rename=output)
+            cmds.file(save=True, type='mayaAscii', force=True)
+            result['output'] = output
+    except Exception:
+        result['error'] = traceback.format_exc()
+    result['seconds'] = time.time() - start
+
+    return result
+
+
+class BatchBuilder(object):
+
+    pollInterval = 0.05
+
+    def __init__(self, processes=None, backend='maya', retries=1, outputDir=None, context=None, timeout=600.0):
+        # type: (int, str, int, str, str, float) -> None
+        if backend not in backends:
+            raise ValueError('Unrecognized backend -> {}'.format(backend))
+
+        self.processes = max(1, int(processes or multiprocessing.cpu_count()))
+        self.backend = backend
+        self.retries = max(0, int(retries))
+        self.outputDir = outputDir
+        self.context = context  # multiprocessing start method, spawn is the safe choice for mayapy
+        self.timeout = timeout  # seconds a job may run, a crashed worker never answers
+
+    def createPool(self):  # type: () -> multiprocessing.pool.Pool
+        context = multiprocessing.get_context(self.context) if self.context else multiprocessing
+        return context.Pool(self.processes, initializer=initializeWorker, initargs=(self.backend,))
+
+    def build(self, paths):  # type: (list) -> list
+        # jobs are tracked by index, the same path (or file name) can be listed more than once
+        queue = collections.deque()
+        names = set()
+        for index, path in enumerate(paths):
+            name = os.path.splitext(os.path.basename(path))[0]
+            if name in names:
+                name = '{}_{}'.format(name, index)
+            names.add(name)
+            queue.append({
+                'index': index,
+                'path': path,
+                'name': name,
+                'outputDir': self.outputDir,
+                'attempt': 0,
+            })
+
+        if self.outputDir and not os.path.isdir(self.outputDir):
+            os.makedirs(self.outputDir)
+
+        # no more jobs in flight than workers, so a job's timeout runs from its actual start
+        results = dict()
+        running = collections.OrderedDict()  # index -> (job, async result, start time)
+        pool = self.createPool()
+        try:
+            while queue or running:
+                while queue and len(running) < self.processes:
+                    job = queue.popleft()
+                    running[job['index']] = job, pool.apply_async(buildJob, (job,)), time.time()
+
+                stalled = False
+                for index, (job, asyncResult, start) in list(running.items()):
+                    if asyncResult.ready():
+                        result = asyncResult.get()
+                    elif self.timeout is not None and time.time() - start > self.timeout:
+                        # a worker that died took its job with it, one that hangs keeps its slot
+                        result = dict(job, output=None, seconds=time.time() - start, pid=None, error=(
+                            'No result after {:.1f}s, the worker crashed or hung'.format(self.timeout)
+                        ))
+                        stalled = True
+                    else:
+                        continue
+
+                    del running[index]
+                    results[index] = result
+                    if result['error'] and result['attempt'] < self.retries:
+                        queue.append(dict(
+                            ((k, result[k]) for k in ('index', 'path', 'name', 'outputDir')),
+                            attempt=result['attempt'] + 1,
+                        ))
+
+                if stalled:
+                    # free the stuck workers, jobs still running start over on the new pool
+                    pool.terminate()
+                    pool.join()
+                    queue.extendleft(job for job, _, _ in reversed(list(running.values())))
+                    running.clear()
+                    pool = self.createPool()
+                elif running:
+                    next(iter(running.values()))[1].wait(self.pollInterval)
+        finally:
+            if running:
+                pool.terminate()
+            else:
+                pool.close()
+            pool.join()
+
+        return [results[index] for index in range(len(paths))]
@@ -0,0 +1,326 @@
+import collections
+import json
+import os
+import subprocess
+import sys
+import time
+
+packageName = __name__.rpartition('.')[0]
+packageRoot = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# fake backend results of scaling() for its default sizes, recorded with write=True
+scalingBaselinePath = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scalingBaseline.json')
+
+importTimeScript = '''
+import json, sys, time
+start = time.time()
+import {module}
+seconds = time.time() - start
+print(json.dumps({{'seconds': seconds, 'maya': any(m.split('.')[0] == 'maya' for m in sys.modules)}}))
+'''
+
+
+def importTime(module, repeat=3):  # type: (str, int) -> dict
+    """Cold import of a module in fresh interpreters, best of `repeat`."""
+    fullName = '{}.{}'.format(packageName, module) if module else packageName
+
+    results = list()
+    for _ in range(max(1, repeat)):
+        output = subprocess.check_output(
+            (sys.executable, '-c', importTimeScript.format(module=fullName)),
+            cwd=packageRoot,
+        )
+        results.append(json.loads(output.decode().strip().splitlines()[-1]))
+
+    best = min(results, key=lambda r: r['seconds'])
+    best['module'] = fullName
+    return best
+
+
+def checkImportTime(modules=('', 'RParam', 'RComp', 'RRig'), budget=0.2):
+    # type: (tuple, float) -> list
+    results = [importTime(module) for module in modules]
+
+    for result in results:
+        if result['maya']:
+            raise RuntimeError('{} imports maya at import time'.format(result['module']))
+        if result['seconds'] > budget:
+            raise RuntimeError(
+                '{} took {:.3f}s to import (budget: {:.3f}s)'.format(result['module'], result['seconds'], budget)
+            )
+
+    return results
+
+
+def sampleRig(bufferless=False):  # type: (bool) -> RRig.RRig
+    """The rig of the package test, built from fixed guide matrices."""
+    from . import RComp, RParam, RRig
+
+    def guide(x, y, z):
+        return RParam.Matrix(*list(RParam.Matrix().aslist())[:12] + [x, y, z, 1.0])
+
+    baseComponent = RComp.RBaseComponent(ctrlSize=10.0, bufferless=bufferless)
+
+    l_ctrlComp = RComp.RCtrlComponent(side=RComp.Config.leftSide, matrix=guide(5.0, 10.0, 0.0), bufferless=bufferless)
+    r_ctrlComp = l_ctrlComp.mirrored()
+
+    chainMatrices = guide(5.0, 12.0, 0.0), guide(8.0, 12.0, 0.0), guide(11.0, 12.0, 0.0)
+    l_chainComp = RComp.RFkChainComponent(matrices=chainMatrices, side=RComp.Config.leftSide, bufferless=bufferless)
+    r_chainComp = l_chainComp.mirrored()
+
+    connections = [
+        (baseComponent, 1, l_ctrlComp, 0),
+        (baseComponent, 1, r_ctrlComp, 0),
+        (l_ctrlComp, 0, l_chainComp, 0),
+        (r_ctrlComp, 0, r_chainComp, 0),
+    ]
+    components = baseComponent, l_ctrlComp, r_ctrlComp, l_chainComp, r_chainComp
+    return RRig.RRig(components=components, connections=connections)
+
+
+def buildOnFakeScene(rig, memory=False):  # type: (RRig.RRig, bool) -> dict
+    """Build time, scene calls and node types of a rig built on a fresh fake scene, peak traced memory on demand."""
+    from . import RFakeScene
+    from .RScene import cmds
+
+    fakeCmds = RFakeScene.FakeCmds()
+    cmds.setModule(fakeCmds)
+    if memory:
+        import tracemalloc
+        tracemalloc.start()
+    try:
+        start = time.time()
+        rig.create()
+        seconds = time.time() - start
+        peakMemory = tracemalloc.get_traced_memory()[1] if memory else None
+        calls = sum(fakeCmds.calls.values())
+        nodeTypes = collections.Counter(node.type for node in fakeCmds.nodes.values())
+    finally:
+        if memory:
+            tracemalloc.stop()
+        cmds.setModule(None)
+
+    result = {'seconds': seconds, 'calls': calls, 'nodeTypes': dict(nodeTypes)}
+    if memory:
+        result['peakMemory'] = peakMemory
+    return result
+
+
+def bufferlessComparison():  # type: () -> dict
+    """Build the sample rig with buffer groups and with offsetParentMatrix placement."""
+    results = dict()
+    for name, bufferless in (('buffered', False), ('bufferless', True)):
+        result = buildOnFakeScene(sampleRig(bufferless=bufferless))
+        result['transforms'] = result['nodeTypes'].get('transform', 0)
+        results[name] = result
+    return results
+
+
+def arrayComparison(count=400, bufferless=False):  # type: (int, bool) -> dict
+    """Build `count` three ctrl fk chains as separate components, then as one array built once and copied."""
+    from . import RComp, RParam, RRig
+
+    def guide(x):
+        return RParam.Matrix(*list(RParam.Matrix().aslist())[:12] + [x, 0.0, 0.0, 1.0])
+
+    roots = [guide(index * 10.0) for index in range(count)]
+    chain = [guide(0.0), guide(3.0), guide(6.0)]
+
+    separate = [
+        RComp.RFkChainComponent(matrices=[root.dot(matrix) for matrix in chain], index=index, bufferless=bufferless)
+        for index, root in enumerate(roots)
+    ]
+    array = RComp.RArrayComponent(
+        componentType='RFkChainComponent',
+        componentData={'matrices': chain},
+        matrices=roots,
+        bufferless=bufferless,
+    )
+
+    results = dict()
+    for name, components in (('separate', separate), ('array', [array])):
+        result = buildOnFakeScene(RRig.RRig(components=components))
+        result['transforms'] = result['nodeTypes'].get('transform', 0)
+        results[name] = result
+    return results
+
+
+def scaling(sizes=(10, 100, 1000), seed=0, baselinePath=scalingBaselinePath, tolerance=0.1, timeTolerance=0.5,
+            write=False, **kwargs):
+    # type: (tuple, int, str, float, float, bool, ...) -> list
+    """
+    Build seeded synthetic rigs of growing size on the fake backend, kwargs go to RWorkload.WorkloadGenerator.
+    Results are compared with the baseline file unless baselinePath is None, write=True records missing sizes.
+    """
+    from . import RWorkload
+
+    results = list()
+    for size in sizes:
+        rig, guides = RWorkload.WorkloadGenerator(seed=seed, **kwargs).generate(size)
+        result = buildOnFakeScene(rig, memory=True)
+        result['size'] = size
+        result['components'] = len(rig.components)
+        result['guides'] = len(guides)
+        results.append(result)
+
+    if baselinePath:
+        checkScalingBaseline(results, baselinePath, tolerance=tolerance, timeTolerance=timeTolerance, write=write)
+
+    return results
+
+
+def checkScalingBaseline(results, baselinePath, tolerance=0.1, timeTolerance=0.5, write=False):
+    # type: (list, str, float, float, bool) -> list
+    """
+    Raise when calls or memory grew by more than `tolerance`, or build time by more than `timeTolerance`.
+    A missing baseline file or size raises too, unless write=True records it.
+    """
+    baseline = dict()
+    if os.path.exists(baselinePath):
+        with open(baselinePath) as f:
+            baseline = json.load(f)
+
+    missing = [result['size'] for result in results if str(result['size']) not in baseline]
+    if missing and not write:
+        raise RuntimeError('No scaling baseline for sizes {} in {}, record them with write=True'.format(
+            missing,
+            baselinePath,
+        ))
+
+    regressions = list()
+    for result in results:
+        key = str(result['size'])
+        if key not in baseline:
+            baseline[key] = dict((k, result[k]) for k in ('seconds', 'calls', 'peakMemory', 'components'))
+            continue
+
+        for metric, allowed in (('calls', tolerance), ('peakMemory', tolerance), ('seconds', timeTolerance)):
+            if result[metric] > baseline[key][metric] * (1.0 + allowed):
+                regressions.append((result['size'], metric, baseline[key][metric], result[metric]))
+
+    if regressions:
+        raise RuntimeError('Scaling regressions:\n{}'.format(
+            '\n'.join('  {} components, {}: {} -> {}'.format(*regression) for regression in regressions),
+        ))
+
+    if missing:
+        with open(baselinePath, 'w') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+
+    return regressions
+
+
+def formatScaling(results):  # type: (list) -> str
+    lines = ['{:>8} {:>10} {:>10} {:>10} {:>12}'.format('size', 'components', 'seconds', 'calls', 'peakMemory')]
+    for result in results:
+        lines.append('{:>8} {:>10} {:>10.3f} {:>10} {:>12}'.format(
+            result['size'], result['components'], result['seconds'], result['calls'], result['peakMemory'],
+        ))
+    return '\n'.join(lines)
+
+
+def guideLoading(paths, processes=None, workers=None):  # type: (list, bool, int) -> dict
+    """Time a GuideWorkspace load of `paths` against a serial load and the largest file alone."""
+    from . import RData
+
+    paths = [str(path) for path in paths]
+    largest = max(paths, key=os.path.getsize)
+
+    start = time.time()
+    RData.MatrixFile(largest).load()
+    largestSeconds = time.time() - start
+
+    start = time.time()
+    for path in paths:
+        RData.MatrixFile(path).load()
+    serialSeconds = time.time() - start
+
+    start = time.time()
+    workspace = RData.GuideWorkspace(paths, processes=processes, workers=workers)
+    workspaceSeconds = time.time() - start
+
+    return {
+        'files': len(paths),
+        'guides': len(workspace),
+        'largest': largestSeconds,
+        'serial': serialSeconds,
+        'workspace': workspaceSeconds,
+    }
+
+
+def evaluationTime(frames=50):  # type: (int) -> float
+    """Seconds per frame to evaluate the open maya scene, dirtied before each frame change."""
+    from .RScene import cmds
+
+    start = time.time()
+    for frame in range(frames):
+        cmds.dgdirty(allPlugs=True)
+        cmds.currentTime(frame, update=True)
+    return (time.time() - start) / frames
+
+
+def leastSquares(rows, values, ridge=1e-6):  # type: (list, list, float) -> list
+    """Weights minimizing |rows * weights - values|, solved from the (ridge damped) normal equations."""
+    size = len(rows[0])
+    system = [
+        [sum(row[i] * row[j] for row in rows) + (ridge if i == j else 0.0) for j in range(size)]
+        + [sum(row[i] * value for row, value in zip(rows, values))]
+        for i in range(size)
+    ]
+
+    # gauss-jordan elimination with partial pivoting
+    for column in range(size):
+        pivot = max(range(column, size), key=lambda r: abs(system[r][column]))
+        system[column], system[pivot] = system[pivot], system[column]
+        for row in range(size):
+            if row != column and system[column][column]:
+                factor = system[row][column] / system[column][column]
+                system[row] = [a - factor * b for a, b in zip(system[row], system[column])]
+
+    return [system[i][size] / system[i][i] if system[i][i] else 0.0 for i in range(size)]
+
+
+def calibrateCostTable(sizes=(10, 30, 100, 300), seed=0, frames=50, path=None, measure=None):
+    # type: (tuple, int, int, str, callable) -> RCost.CostTable
+    """
+    Fit the CostTable weights to the evaluation time of synthetic rigs built in the current maya session,
+    buffered and bufferless, relative to one transform. `measure` times the open scene (evaluationTime by default).
+    With a path, the weights are dumped for CostTable.fromFile.
+    """
+    from . import RCost, RWorkload
+    from .RScene import cmds
+
+    measure = measure or (lambda: evaluationTime(frames))
+    categories = RCost.CostReport.categories
+
+    # time of an empty scene, not owed to any node
+    cmds.file(new=True, force=True)
+    baseline = measure()
+
+    rows = list()
+    values = list()
+    for size in sizes:
+        for bufferless in (False, True):
+            rig, _ = RWorkload.WorkloadGenerator(seed=seed).generate(size)
+            for component in rig.components:
+                component.bufferless = bufferless
+
+            cmds.file(new=True, force=True)
+            rig.create()
+            totals = RCost.CostReport(rig).totals()
+            rows.append([float(totals.get(category, 0)) for category in categories])
+            values.append(measure() - baseline)
+
+    # categories missing from every sample can not be fitted, they keep their default weight,
+    # categories always growing together only get their summed weight right
+    fitted = [i for i, category in enumerate(categories) if any(row[i] for row in rows)]
+    weights = leastSquares([[row[i] for i in fitted] for row in rows], values)
+    weights = dict((categories[i], max(0.0, weight)) for i, weight in zip(fitted, weights))
+
+    unit = weights.get('transforms') or 1.0
+    costTable = RCost.CostTable(dict((category, weight / unit) for category, weight in weights.items()))
+
+    if path:
+        with open(path, 'w') as f:
+            json.dump(costTable.weights, f, indent=2, sort_keys=True)
+
+    return costTable
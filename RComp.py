@@ -1,5 +1,5 @@
-from maya import cmds
-from . import RParam, RObj
+from . import RParam, RObj, RData, RScene
+from .RScene import cmds
 import rigBuilder as RBuild
 
 
@@ -23,10 +23,14 @@ class Config(object):
         centerSide: None,
     }
 
+    # metadata attributes
+    descriptionAttr = 'description'
+    metadataKeys = 'skinJoints', 'inputs', 'outputs', 'controllers', 'ctrlBuffers'
+
     # colors
-    leftColor = 0, 255, 0
-    rightColor = 255, 0, 0
-    centerColor = 255, 255, 0
+    leftColor = RParam.FrozenColor(0, 255, 0)
+    rightColor = RParam.FrozenColor(255, 0, 0)
+    centerColor = RParam.FrozenColor(255, 255, 0)
 
     sideColorTable = {
         leftSide: leftColor,
@@ -45,11 +49,22 @@ class RMayaComponent(RBuild.RBaseComponent):
     defaultSide = Config.centerSide
     defaultIndex = 0
     defaultCtrlSize = 1.0
-    defaultCtrlNormal = 1.0, 0.0, 0.0
-    defaultColor = 127, 127, 127
-
-    def __init__(self, name=None, side=None, index=None, ctrlColor=None, ctrlSize=None, ctrlNormal=None):
-        # type: (str, str, int, RParam.Color, float, RParam.Vector3) -> None
+    defaultCtrlNormal = RParam.FrozenVector3(1.0, 0.0, 0.0)
+    defaultColor = RParam.FrozenColor(127, 127, 127)
+    defaultBufferless = False
+
+    def __init__(
+            self,
+            name=None,
+            side=None,
+            index=None,
+            ctrlColor=None,
+            ctrlSize=None,
+            ctrlNormal=None,
+            guides=None,
+            bufferless=None,
+    ):
+        # type: (str, str, int, RParam.Color, float, RParam.Vector3, list, bool) -> None
         super(RMayaComponent, self).__init__()
 
         # naming parameters
@@ -59,17 +74,21 @@ class RMayaComponent(RBuild.RBaseComponent):
 
         # display parameters
         defaultColor = Config.sideColorTable.get(self.side, self.defaultColor)
-        self.ctrlColor = RParam.Color(*RBuild.get(ctrlColor, defaultColor))
+        self.ctrlColor = RParam.FrozenColor.interned(RBuild.get(ctrlColor, defaultColor))
         self.ctrlSize = max(0.0, float(RBuild.get(ctrlSize, self.defaultCtrlSize)))
-        self.ctrlNormal = RParam.Vector3(*RBuild.get(ctrlNormal, self.defaultCtrlNormal))
+        self.ctrlNormal = RParam.FrozenVector3.interned(RBuild.get(ctrlNormal, self.defaultCtrlNormal))
+
+        # place controllers through their offsetParentMatrix instead of a buffer transform
+        self.bufferless = bool(RBuild.get(bufferless, self.defaultBufferless))
+
+        # guide each ctrl buffer was placed from, in ctrlBuffers order (None when not placed from a guide)
+        self.guides = [None if guide is None else str(guide) for guide in RBuild.get(guides, list())]
 
         # internal objects
         self.folder = None
         self.rootDags = list()
         self.skinJoints = list()
-
-        # create
-        self.create()
+        self.ctrlBuffers = list()
 
     def composeObjName(self, objType, nameExtra=None):
         name = '{}_{}'.format(self.name, nameExtra) if nameExtra is not None else self.name
@@ -85,13 +104,25 @@ class RMayaComponent(RBuild.RBaseComponent):
         data['name'] = self.name
         data['side'] = self.side
         data['index'] = self.index
+        data['ctrlSize'] = self.ctrlSize
+        data['ctrlColor'] = self.ctrlColor
+        data['ctrlNormal'] = self.ctrlNormal
+        data['guides'] = self.guides
+        data['bufferless'] = self.bufferless
         return data
 
-    def asmirroreddict(self):  # type: () -> dict
+    def asmirroreddict(self, mirrorAxis='x'):  # type: (basestring) -> dict
         data = super(RMayaComponent, self).asmirroreddict()
         data['side'] = Config.sideMirrorTable.get(data['side'], None)
+        data['ctrlNormal'] = self.ctrlNormal.mirrored(mirrorAxis)
+        if self.hasSideColor():
+            data['ctrlColor'] = None  # the mirrored side gets its own color
+        data['guides'] = list()
         return data
 
+    def hasSideColor(self):  # type: () -> bool
+        return self.ctrlColor == Config.sideColorTable.get(self.side, self.defaultColor)
+
     def _initializeCreation(self):
         folderName = self.composeObjName(Config.componentTypeStr)
 
@@ -107,26 +138,136 @@ class RMayaComponent(RBuild.RBaseComponent):
         if self.rootDags:
             cmds.parent(self.rootDags, self.folder)
 
-        data = (
-            ('skinJoints', self.skinJoints),
-            ('inputs', self.inputs),
-            ('outputs', self.outputs),
-            ('controllers', self.controllers)
+        descriptionPlug = '{}.{}'.format(self.folder, Config.descriptionAttr)
+        cmds.addAttr(self.folder, longName=Config.descriptionAttr, dataType='string')
+        cmds.setAttr(descriptionPlug, RData.RigFile.dumpsComponent(self), type='string')
+
+        # one multi message attribute per category on the folder, items stay untouched
+        for key in Config.metadataKeys:
+            cmds.addAttr(self.folder, longName=key, attributeType='message', multi=True)
+
+        for key in Config.metadataKeys:
+            for index, item in enumerate(getattr(self, key)):
+                cmds.connectAttr('{}.message'.format(item), '{}.{}[{}]'.format(self.folder, key, index))
+
+    def objectCounts(self):  # type: () -> dict
+        # number of items _doCreation puts in each list, without building
+        return dict((key, 0) for key in Config.metadataKeys)
+
+    def nodeCounts(self):  # type: () -> dict
+        objects = self.objectCounts()
+        controllers = objects['controllers']
+        buffers = 0 if self.bufferless else objects['ctrlBuffers']
+        return {
+            'transforms': 1 + controllers + buffers,
+            'shapes': controllers,
+            'joints': objects['skinJoints'],
+            'constraints': 0,
+            'dgNodes': controllers,  # controller tags
+            'connections': sum(objects.values()) + controllers,
+            'controllers': controllers,
+            'buffers': buffers,
+        }
+
+    def placeController(self, ctrl, matrix=None, parent=None, parentMatrix=None):
+        # type: (RObj.Controller, RParam.Matrix, str, RParam.Matrix) -> str
+        """
+        Put ctrl at the world `matrix` under `parent` (whose world matrix is `parentMatrix`).
+        Returns the node holding the placement: a new buffer, or the ctrl itself when bufferless.
+        """
+        if not self.bufferless:
+            ctrlBuffer = RObj.createBuffer(ctrl)
+            if matrix is not None:
+                cmds.xform(ctrlBuffer, matrix=list(matrix))
+            if parent is not None:
+                cmds.parent(ctrlBuffer, parent)
+            return ctrlBuffer
+
+        if matrix is not None:
+            localMatrix = RParam.Matrix(*matrix)
+            if parentMatrix is not None:
+                localMatrix = localMatrix.dot(RParam.Matrix(*parentMatrix).inverse())
+            RObj.setOffsetParentMatrix(ctrl, localMatrix)
+        if parent is not None:
+            cmds.parent(str(ctrl), parent, relative=True)
+        return str(ctrl)
+
+    def setPlacementMatrix(self, node, matrix):  # type: (str, RParam.Matrix) -> None
+        # world placement of a top level placement node returned by placeController
+        if self.bufferless:
+            RObj.setOffsetParentMatrix(node, matrix)
+        else:
+            cmds.xform(node, matrix=list(matrix), worldSpace=True)
+
+    def creationPhases(self):  # type: () -> tuple
+        return (
+            ('initialize', self._initializeCreation),
+            ('create', self._doCreation),
+            ('finalize', self._finalizeCreation),
         )
 
-        for key, items in data:
-            folderMessagePlug = '{}.{}'.format(self.folder, key)
-            cmds.addAttr(self.folder, longName=key, attributeType='message')
+    def create(self):
+        for _, phase in self.creationPhases():
+            phase()
 
-            for item in items:
-                itemMessagePlug = '{}.{}'.format(item, key)
-                cmds.addAttr(item, longName=key, attributeType='message')
-                cmds.connectAttr(folderMessagePlug, itemMessagePlug)
+    @classmethod
+    def fromScene(cls, folder):  # type: (str) -> RMayaComponent
+        description = cmds.getAttr('{}.{}'.format(folder, Config.descriptionAttr))
+        component = RData.RigFile.loadsComponent(description, getComponentTypes())
+        if not isinstance(component, cls):
+            raise TypeError('{} is not a {} -> {}'.format(folder, cls.__name__, component.__class__.__name__))
 
-    def create(self):
-        self._initializeCreation()
-        self._doCreation()
-        self._finalizeCreation()
+        component.folder = folder
+        for key, items in component.readMetadata().items():
+            getattr(component, key)[:] = items
+        component._finalizeRehydration()
+
+        return component
+
+    def _finalizeRehydration(self):
+        pass
+
+    def readMetadata(self):  # type: () -> dict
+        indexedItems = dict((key, dict()) for key in Config.metadataKeys)
+
+        # one query for every category: [folder.key[i], item, folder.key[i], item, ...]
+        connections = cmds.listConnections(
+            self.folder,
+            source=True,
+            destination=False,
+            connections=True,
+            plugs=False,
+        ) or list()
+
+        for plug, item in zip(connections[::2], connections[1::2]):
+            key, _, index = plug.partition('.')[2].rstrip(']').partition('[')
+            if key in indexedItems and index:
+                indexedItems[key][int(index)] = item
+
+        return dict((key, [items[i] for i in sorted(items)]) for key, items in indexedItems.items())
+
+    def readMetadataCategory(self, key):  # type: (str) -> list
+        if key not in Config.metadataKeys:
+            raise ValueError('Unrecognized metadata category -> {}'.format(key))
+
+        connections = cmds.listConnections(
+            '{}.{}'.format(self.folder, key),
+            source=True,
+            destination=False,
+            connections=True,
+            plugs=False,
+        ) or list()
+
+        indexedItems = dict(
+            (int(plug.rstrip(']').rpartition('[')[2]), item)
+            for plug, item in zip(connections[::2], connections[1::2])
+        )
+        return [indexedItems[i] for i in sorted(indexedItems)]
+
+    def resetCreation(self):
+        self.folder = None
+        for items in (self.rootDags, self.skinJoints, self.inputs, self.outputs, self.controllers, self.ctrlBuffers):
+            del items[:]
 
 
 # Components #
@@ -135,14 +276,17 @@ class RMayaComponent(RBuild.RBaseComponent):
 class RCtrlComponent(RMayaComponent):
 
     defaultName = 'oneCtrl'
-    defaultMatrix = RParam.Matrix()
+    defaultMatrix = RParam.FrozenMatrix()
 
     def __init__(self, matrix=None, **kwargs):
         # type: (RParam.Matrix, ...) -> None
 
-        self.matrix = RParam.Matrix(*RBuild.get(matrix, self.defaultMatrix))
+        self.matrix = RParam.FrozenMatrix.interned(RBuild.get(matrix, self.defaultMatrix))
         super(RCtrlComponent, self).__init__(**kwargs)
 
+    def objectCounts(self):  # type: () -> dict
+        return {'skinJoints': 1, 'inputs': 1, 'outputs': 1, 'controllers': 1, 'ctrlBuffers': 1}
+
     def _doCreation(self):
         ctrl = RObj.Controller.create(
             name=self.composeObjName(Config.controllerTypeStr),
@@ -151,9 +295,7 @@ class RCtrlComponent(RMayaComponent):
             size=self.ctrlSize
         )
         joint = cmds.joint(name=self.composeObjName(Config.skinJointTypeStr))
-        ctrlBuffer = RObj.createBuffer(ctrl)
-
-        cmds.xform(ctrlBuffer, matrix=self.matrix.aslist())
+        ctrlBuffer = self.placeController(ctrl, self.matrix)
 
         self.inputs.append(ctrlBuffer)
         self.outputs.append(ctrl)
@@ -161,17 +303,16 @@ class RCtrlComponent(RMayaComponent):
         self.controllers.append(ctrl)
         self.skinJoints.append(joint)
         self.rootDags.append(ctrlBuffer)
+        self.ctrlBuffers.append(ctrlBuffer)
 
     def asdict(self):  # type: () -> dict
         data = super(RCtrlComponent, self).asdict()
         data['matrix'] = self.matrix
-        data['ctrlNormal'] = self.ctrlNormal
         return data
 
     def asmirroreddict(self, mirrorAxis='x'):  # type: (basestring) -> dict
-        data = super(RCtrlComponent, self).asmirroreddict()
+        data = super(RCtrlComponent, self).asmirroreddict(mirrorAxis)
         data['matrix'] = self.matrix.mirrored(mirrorAxis)
-        data['ctrlNormal'] = self.ctrlNormal.mirrored(mirrorAxis)
         return data
 
 
@@ -181,7 +322,10 @@ class RBaseComponent(RMayaComponent):
     localName = 'local'
 
     defaultName = 'base'
-    defaultCtrlNormal = 0.0, 1.0, 0.0
+    defaultCtrlNormal = RParam.FrozenVector3(0.0, 1.0, 0.0)
+
+    def objectCounts(self):  # type: () -> dict
+        return {'skinJoints': 2, 'inputs': 1, 'outputs': 2, 'controllers': 2, 'ctrlBuffers': 2}
 
     def _doCreation(self):
         worldCtrl = RObj.Controller.create(
@@ -191,7 +335,7 @@ class RBaseComponent(RMayaComponent):
             size=self.ctrlSize,
         )
         worldJoint = cmds.joint(name=self.composeObjName(nameExtra=self.worldName, objType=Config.skinJointTypeStr))
-        worldBuffer = RObj.createBuffer(worldCtrl)
+        worldBuffer = self.placeController(worldCtrl)
 
         localCtrl = RObj.Controller.create(
             name=self.composeObjName(nameExtra='local', objType=Config.controllerTypeStr),
@@ -200,9 +344,7 @@ class RBaseComponent(RMayaComponent):
             size=self.ctrlSize * .8,
         )
         localJoint = cmds.joint(name=self.composeObjName(nameExtra='local', objType=Config.skinJointTypeStr))
-        localBuffer = RObj.createBuffer(localCtrl)
-
-        cmds.parent(localBuffer, worldCtrl)
+        localBuffer = self.placeController(localCtrl, parent=str(worldCtrl))
 
         self.inputs.append(worldBuffer)
 
@@ -217,25 +359,28 @@ class RBaseComponent(RMayaComponent):
         self.skinJoints.append(worldJoint)
         self.skinJoints.append(localJoint)
 
+        self.ctrlBuffers.append(worldBuffer)
+        self.ctrlBuffers.append(localBuffer)
+
 
 class RFkChainComponent(RMayaComponent):
 
     defaultName = 'fkChain'
 
     defaultMatrices = (
-        (
+        RParam.FrozenMatrix(
             0.0, 1.0, 0.0, 0.0,
             0.0, 0.0, 1.0, 0.0,
             1.0, 0.0, 0.0, 0.0,
             0.0, 0.0, 0.0, 1.0
         ),
-        (
+        RParam.FrozenMatrix(
             0.0, 1.0, 0.0, 0.0,
             0.0, 0.0, 1.0, 0.0,
             1.0, 0.0, 0.0, 0.0,
             0.0, 10.0, 0.0, 1.0
         ),
-        (
+        RParam.FrozenMatrix(
             0.0, 1.0, 0.0, 0.0,
             0.0, 0.0, 1.0, 0.0,
             1.0, 0.0, 0.0, 0.0,
@@ -246,7 +391,11 @@ class RFkChainComponent(RMayaComponent):
     def __init__(self, matrices=None, **kwargs):
         super(RFkChainComponent, self).__init__(**kwargs)
 
-        self.matrices = [RParam.Matrix(*m) for m in RBuild.get(matrices, self.defaultMatrices)]
+        self.matrices = [RParam.FrozenMatrix.interned(m) for m in RBuild.get(matrices, self.defaultMatrices)]
+
+    def objectCounts(self):  # type: () -> dict
+        count = len(self.matrices)
+        return {'skinJoints': count, 'inputs': 1, 'outputs': count, 'controllers': count, 'ctrlBuffers': count}
 
     def _doCreation(self):
         ctrls = list()
@@ -260,14 +409,13 @@ class RFkChainComponent(RMayaComponent):
             skinJoint = cmds.joint(name=self.composeObjName(objType=Config.skinJointTypeStr, nameExtra=index))
             self.skinJoints.append(skinJoint)
 
-            ctrlBuffer = RObj.createBuffer(ctrl)
-            cmds.xform(ctrlBuffer, matrix=matrix.aslist())
-
             if index > 0:
-                cmds.parent(ctrlBuffer, ctrls[-1])
+                ctrlBuffer = self.placeController(ctrl, matrix, parent=str(ctrls[-1]), parentMatrix=self.matrices[index - 1])
             else:
+                ctrlBuffer = self.placeController(ctrl, matrix)
                 self.inputs.append(ctrlBuffer)
                 self.rootDags.append(ctrlBuffer)
+            self.ctrlBuffers.append(ctrlBuffer)
             ctrls.append(ctrl)
 
         self.controllers += ctrls
@@ -279,7 +427,186 @@ class RFkChainComponent(RMayaComponent):
         return data
 
     def asmirroreddict(self, mirrorAxis='x'):  # type: (str) -> dict
-        data = super(RFkChainComponent, self).asmirroreddict()
+        data = super(RFkChainComponent, self).asmirroreddict(mirrorAxis)
         matrices = data['matrices']
         data['matrices'] = [matrix.mirrored(mirrorAxis=mirrorAxis) for matrix in matrices]
         return data
+
+
+def composeNameToken(side, index):  # type: (str, int) -> str
+    # the part of Config.objNamePattern that changes with side and index, e.g. '_L_0_'
+    return Config.objNamePattern.format(name='', side=side, index=index, objType='')
+
+
+def relocateValue(value, delta):  # type: (object, RParam.Matrix) -> object
+    if isinstance(value, RParam.Matrix):
+        return value.dot(delta)
+    if isinstance(value, (list, tuple)) and value and all(isinstance(v, RParam.Matrix) for v in value):
+        return [v.dot(delta) for v in value]
+    return value
+
+
+class RArrayComponent(RMayaComponent):
+    """
+    Instances of one component type that differ only by root matrix, side and index.
+    The first instance is built normally, the others are duplicated from it and renamed.
+    """
+
+    defaultName = 'array'
+    defaultComponentType = 'RFkChainComponent'
+
+    def __init__(self, componentType=None, componentData=None, matrices=None, sides=None, indices=None, **kwargs):
+        # type: (str, dict, RParam.MatrixArray, list, list, ...) -> None
+        super(RArrayComponent, self).__init__(**kwargs)
+
+        self.componentType = str(RBuild.get(componentType, self.defaultComponentType))
+        self.componentData = dict(RBuild.get(componentData, dict()))
+        self.matrices = RParam.MatrixArray(RBuild.get(matrices, list()))
+
+        count = len(self.matrices)
+        self.sides = [str(side) for side in RBuild.get(sides, [self.side] * count)]
+        self.indices = [int(index) for index in RBuild.get(indices, range(count))]
+
+        if len(self.sides) != count or len(self.indices) != count:
+            raise ValueError(
+                'Got {} matrices, {} sides and {} indices'.format(count, len(self.sides), len(self.indices))
+            )
+
+        self.instances = list()
+
+    def getComponentType(self):  # type: () -> type
+        componentType = getComponentTypes().get(self.componentType)
+        if componentType is None or issubclass(componentType, RArrayComponent):
+            raise TypeError('Invalid array component type -> {}'.format(self.componentType))
+        return componentType
+
+    def asinstancedicts(self):  # type: () -> list
+        prototypeData = self.getComponentType()(**self.componentData).asdict()
+
+        # display settings of componentData win, then the ones set on the array itself
+        prototypeData['bufferless'] = self.bufferless  # the rig wires instances after the array's mode
+        if 'ctrlSize' not in self.componentData:
+            prototypeData['ctrlSize'] = self.ctrlSize
+        if 'ctrlNormal' not in self.componentData and self.ctrlNormal != self.defaultCtrlNormal:
+            prototypeData['ctrlNormal'] = self.ctrlNormal
+        if 'ctrlColor' not in self.componentData:
+            # a side color follows the side of each instance
+            prototypeData['ctrlColor'] = None if self.hasSideColor() else self.ctrlColor
+
+        prototypeRoot = prototypeData.get('matrix') or (prototypeData.get('matrices') or [RParam.Matrix()])[0]
+        prototypeRootInverse = prototypeRoot.inverse()
+
+        dicts = list()
+        for matrix, side, index in zip(self.matrices, self.sides, self.indices):
+            delta = prototypeRootInverse.dot(matrix)
+            data = dict((key, relocateValue(value, delta)) for key, value in prototypeData.items())
+            data['side'] = side
+            data['index'] = index
+            data['guides'] = list()  # instances are placed from self.matrices
+            dicts.append(data)
+
+        return dicts
+
+    def objectCounts(self):  # type: () -> dict
+        counts = dict((key, 0) for key in Config.metadataKeys)
+        for instance in self.asinstances():
+            for key, count in instance.objectCounts().items():
+                counts[key] += count
+        return counts
+
+    def nodeCounts(self):  # type: () -> dict
+        counts = dict((key, 0) for key in super(RArrayComponent, self).nodeCounts())
+        for instance in self.asinstances():
+            for key, count in instance.nodeCounts().items():
+                counts[key] += count
+
+        # own folder and the aggregated metadata
+        counts['transforms'] += 1
+        counts['connections'] += sum(self.objectCounts().values())
+        return counts
+
+    def asinstances(self):  # type: () -> list
+        componentType = self.getComponentType()
+        return [componentType(**data) for data in self.asinstancedicts()]
+
+    def _doCreation(self):
+        self.instances = self.asinstances()
+        if not self.instances:
+            return
+
+        prototype = self.instances[0]
+        prototype.create()
+
+        # deepest first, the order duplicates list their nodes in
+        prototypeNodes = cmds.listRelatives(prototype.folder, allDescendents=True) or list()
+        for instance in self.instances[1:]:
+            self._duplicateInstance(prototype, instance, prototypeNodes)
+
+        # root transforms of every copy in one bulk call
+        RScene.setPlacements(
+            [instance.rootDags[0] for instance in self.instances[1:]],
+            self.matrices.aslist()[1:],
+            offsetParent=self.bufferless,
+        )
+
+        for instance in self.instances:
+            self.rootDags.append(instance.folder)
+            for key in Config.metadataKeys:
+                getattr(self, key).extend(getattr(instance, key))
+
+    def _duplicateInstance(self, prototype, instance, prototypeNodes):
+        # type: (RMayaComponent, RMayaComponent, list) -> None
+        prototypeToken = composeNameToken(prototype.side, prototype.index)
+        instanceToken = composeNameToken(instance.side, instance.index)
+
+        def rename(name):
+            head, token, tail = str(name).rpartition(prototypeToken)
+            return '{}{}{}'.format(head, instanceToken, tail) if token else str(name)
+
+        copyFolder = cmds.duplicate(prototype.folder, renameChildren=True)[0]
+
+        # both lists are deepest first and in the same order, renaming copies bottom-up keeps their paths valid
+        copyNodes = cmds.listRelatives(copyFolder, allDescendents=True, fullPath=True) or list()
+
+        nameMap = dict()
+        for prototypeNode, copyNode in zip(prototypeNodes, copyNodes):
+            nameMap[prototypeNode] = cmds.rename(copyNode, rename(prototypeNode))
+        instance.folder = cmds.rename(copyFolder, rename(prototype.folder))
+
+        for key in ('rootDags',) + Config.metadataKeys:
+            getattr(instance, key)[:] = [nameMap[str(node)] for node in getattr(prototype, key)]
+
+        descriptionPlug = '{}.{}'.format(instance.folder, Config.descriptionAttr)
+        cmds.setAttr(descriptionPlug, RData.RigFile.dumpsComponent(instance), type='string')
+
+        # controller tags are not part of the duplicated hierarchy
+        for ctrl in instance.controllers:
+            cmds.controller(ctrl)
+
+        if instance.ctrlColor.aslist() != prototype.ctrlColor.aslist():
+            for ctrl in instance.controllers:
+                RObj.Controller(ctrl).setColor(instance.ctrlColor)
+
+    def _finalizeRehydration(self):
+        instanceFolders = cmds.listRelatives(self.folder, children=True, type='transform') or list()
+        self.instances = [RMayaComponent.fromScene(folder) for folder in instanceFolders]
+
+    def resetCreation(self):
+        super(RArrayComponent, self).resetCreation()
+        self.instances = list()
+
+    def asdict(self):  # type: () -> dict
+        data = super(RArrayComponent, self).asdict()
+        data['componentType'] = self.componentType
+        data['componentData'] = self.componentData
+        data['matrices'] = self.matrices
+        data['sides'] = self.sides
+        data['indices'] = self.indices
+        return data
+
+
+def getComponentTypes():  # type: () -> dict
+    return dict(
+        (name, obj) for name, obj in globals().items()
+        if isinstance(obj, type) and issubclass(obj, RMayaComponent)
+    )
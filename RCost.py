@@ -0,0 +1,138 @@
+import collections
+import json
+import os
+
+# scene connections made by one parentConstraint with maintain offset:
+# target matrices and pivots in, child pivots and parent inverse in, translate and rotate out
+constraintConnections = 13
+# one multMatrix driving a bufferless ctrl: parent world and child parent inverse matrices in, offsetParentMatrix out
+offsetParentConnections = 3
+
+
+class CostTable(object):
+    """
+    Per-frame evaluation cost of each node category, relative to one transform.
+    The default weights are estimates, RBench.calibrateCostTable fits them to timings measured in Maya.
+    """
+
+    defaultWeights = {
+        'transforms': 1.0,
+        'shapes': 0.3,
+        'joints': 1.0,
+        'constraints': 4.0,
+        'dgNodes': 0.2,
+        'connections': 0.05,
+        'controllers': 0.0,
+        'buffers': 0.0,
+    }
+
+    def __init__(self, weights=None):  # type: (dict) -> None
+        self.weights = dict(self.defaultWeights)
+        self.weights.update(weights or dict())
+
+    @classmethod
+    def fromFile(cls, path):  # type: (str) -> CostTable
+        with open(path) as f:
+            return cls(json.load(f))
+
+    def cost(self, counts):  # type: (dict) -> float
+        return sum(self.weights.get(key, 0.0) * count for key, count in counts.items())
+
+
+class CostReport(object):
+
+    categories = 'transforms', 'shapes', 'joints', 'constraints', 'dgNodes', 'connections', 'controllers', 'buffers'
+
+    def __init__(self, rig, costTable=None):  # type: (RRig.RRig, CostTable) -> None
+        self.rigName = rig.name
+        self.costTable = costTable or CostTable()
+
+        self.rows = collections.OrderedDict()
+        for component in rig.components:
+            counts = component.nodeCounts()
+            self.rows[self.componentLabel(component)] = counts
+
+        # rig folder and connections: one constraint (or multMatrix when bufferless) per connection,
+        # fan-out per driving output
+        fanOut = collections.Counter()
+        self.fanOuts = dict((label, 0) for label in self.rows)  # label -> inputs driven by its busiest output
+        rigCounts = dict((key, 0) for key in self.categories)
+        rigCounts['transforms'] = 1
+        for parentComponent, outputIndex, childComponent, inputIndex in rig.connections:
+            if getattr(childComponent, 'bufferless', False):
+                rigCounts['dgNodes'] += 1
+                rigCounts['connections'] += offsetParentConnections
+            else:
+                rigCounts['constraints'] += 1
+                rigCounts['connections'] += constraintConnections
+            fanOut[(self.componentLabel(parentComponent), outputIndex)] += 1
+        self.rows['rig'] = rigCounts
+
+        for (label, _), count in fanOut.items():
+            self.fanOuts[label] = max(self.fanOuts.get(label, 0), count)
+        self.maxFanOut = max(fanOut.values()) if fanOut else 0
+
+    @staticmethod
+    def componentLabel(component):  # type: (RComp.RMayaComponent) -> str
+        return '{}:{}_{}_{}'.format(component.__class__.__name__, component.name, component.side, component.index)
+
+    def totals(self):  # type: () -> dict
+        totals = dict((key, 0) for key in self.categories)
+        for counts in self.rows.values():
+            for key, count in counts.items():
+                totals[key] = totals.get(key, 0) + count
+        return totals
+
+    def asdict(self):  # type: () -> dict
+        totals = self.totals()
+        return {
+            'rig': self.rigName,
+            'components': dict(
+                (label, dict(counts, cost=self.costTable.cost(counts), fanOut=self.fanOuts.get(label, 0)))
+                for label, counts in self.rows.items()
+            ),
+            'totals': dict(totals, cost=self.costTable.cost(totals), maxFanOut=self.maxFanOut),
+        }
+
+    def dump(self, path):  # type: (str) -> None
+        with open(path, 'w') as f:
+            json.dump(self.asdict(), f, indent=2, sort_keys=True)
+
+    def format(self):  # type: () -> str
+        columns = self.categories + ('fanOut', 'cost')
+        labelWidth = max([len(label) for label in self.rows] + [len('total')])
+        lines = [' '.join(['{:<{}}'.format('', labelWidth)] + ['{:>11}'.format(c) for c in columns])]
+
+        rows = [(label, counts, self.fanOuts.get(label, 0)) for label, counts in self.rows.items()]
+        rows.append(('total', self.totals(), self.maxFanOut))
+        for label, counts, fanOut in rows:
+            values = [counts.get(c, 0) for c in self.categories] + [fanOut, round(self.costTable.cost(counts), 2)]
+            lines.append(' '.join(['{:<{}}'.format(label, labelWidth)] + ['{:>11}'.format(v) for v in values]))
+
+        return '\n'.join(lines)
+
+    def checkRegression(self, baselinePath, tolerance=0.05):  # type: (str, float) -> list
+        """
+        Compare totals with a report dumped earlier, raise when a total grew by more than `tolerance`.
+        A missing baseline is written and passes.
+        """
+        if not os.path.exists(baselinePath):
+            self.dump(baselinePath)
+            return list()
+
+        with open(baselinePath) as f:
+            baseline = json.load(f)['totals']
+
+        current = self.asdict()['totals']
+        regressions = [
+            (key, baseline[key], value) for key, value in sorted(current.items())
+            if key in baseline and value > baseline[key] * (1.0 + tolerance)
+        ]
+
+        if regressions:
+            raise RuntimeError('Rig cost regressions in {}:\n{}'.format(
+                self.rigName,
+                '\n'.join('  {}: {} -> {}'.format(*regression) for regression in regressions),
+            ))
+
+        return regressions
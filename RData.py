@@ -1,13 +1,28 @@
+import array
+import base64
+import collections
+import json
+import multiprocessing
+import multiprocessing.pool
+import os
+import struct
+import sys
+
 import rigBuilder
-from maya import cmds
+from . import RParam, RScene
+from .RScene import cmds
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
 
 
 class MatrixFile(rigBuilder.JsonFile):
 
     def export(self, objs, force=False):
-        data = dict()
-        for obj in objs:
-            data[obj] = cmds.xform(obj, q=True, matrix=True, worldSpace=True)
+        objs = [str(obj) for obj in objs]
+        data = dict(zip(objs, RScene.getWorldMatrices(objs)))
 
         self.dump(data, force=force)
 
@@ -15,3 +30,320 @@ class MatrixFile(rigBuilder.JsonFile):
         for name, matrix in self.load().items():
             locator = cmds.spaceLocator(name=name)
             cmds.xform(locator, matrix=matrix)
+
+
+def loadGuideFile(path):  # type: (str) -> tuple
+    # worker side of GuideWorkspace.load: names and one packed float64 block, cheap to send between processes
+    data = MatrixFile(path).load()
+    names = list(data)
+
+    values = array.array('d')
+    for name in names:
+        values.extend(data[name])
+    if len(values) != len(names) * RParam.MatrixArray.size:
+        raise ValueError('Expected {} values per guide -> {}'.format(RParam.MatrixArray.size, path))
+
+    return names, values.tostring() if sys.version_info[0] < 3 else values.tobytes()
+
+
+def unpackGuideFile(names, block):  # type: (list, bytes) -> tuple
+    matrices = RParam.MatrixArray()
+    if sys.version_info[0] < 3:
+        matrices.values.fromstring(block)
+    else:
+        matrices.values.frombytes(block)
+    return dict((name, position) for position, name in enumerate(names)), matrices
+
+
+class GuideWorkspace(object):
+    """
+    Guides of several MatrixFiles merged in one name index, e.g. workspace['chain1'].
+    Files are layers, a guide of a later layer overrides the same guide of the earlier ones (variants after the base).
+    Files are parsed concurrently, in processes outside of maya and in threads inside it.
+    Each layer keeps its matrices packed, a guide becomes a matrix when it is looked up.
+    """
+
+    def __init__(self, paths=None, processes=None, workers=None):  # type: (list, bool, int) -> None
+        self.processes = processes
+        self.workers = workers
+
+        self.layers = collections.OrderedDict()  # path -> ({name: position}, MatrixArray), in override order
+        self.sources = dict()  # name -> path of the winning layer
+        self.matrices = dict()  # name -> winning matrix, filled on lookup
+
+        if paths:
+            self.load(paths)
+
+    def __repr__(self):
+        return '<{}.{}: {} guides from {} files>'.format(
+            self.__class__.__module__,
+            self.__class__.__name__,
+            len(self),
+            len(self.layers),
+        )
+
+    def __getitem__(self, name):  # type: (str) -> RParam.FrozenMatrix
+        matrix = self.matrices.get(name)
+        if matrix is None:
+            positions, matrices = self.layers[self.sources[name]]
+            size = matrices.size
+            matrix = RParam.FrozenMatrix(*matrices.values[positions[name] * size:(positions[name] + 1) * size])
+            self.matrices[name] = matrix
+        return matrix
+
+    def __contains__(self, name):  # type: (str) -> bool
+        return name in self.sources
+
+    def __iter__(self):
+        return iter(self.sources)
+
+    def __len__(self):
+        return len(self.sources)
+
+    def get(self, name, default=None):  # type: (str, object) -> RParam.FrozenMatrix
+        return self[name] if name in self.sources else default
+
+    def source(self, name):  # type: (str) -> str
+        return self.sources[name]
+
+    def overrides(self, name):  # type: (str) -> list
+        # every layer defining the guide, the winning one last
+        return [path for path, (positions, _) in self.layers.items() if name in positions]
+
+    # loading
+
+    def usesProcesses(self, count):  # type: (int) -> bool
+        if self.processes is not None:
+            return self.processes
+        # a process pool would start maya interpreters
+        return count > 1 and 'maya' not in sys.modules
+
+    def load(self, paths):  # type: (list) -> None
+        paths = [str(path) for path in paths]
+        if not paths:
+            return
+
+        workers = self.workers or min(len(paths), multiprocessing.cpu_count())
+        if workers < 2:
+            datas = [loadGuideFile(path) for path in paths]
+        else:
+            poolType = multiprocessing.Pool if self.usesProcesses(len(paths)) else multiprocessing.pool.ThreadPool
+            pool = poolType(workers)
+            try:
+                datas = pool.map(loadGuideFile, paths, chunksize=1)
+            finally:
+                pool.close()
+                pool.join()
+
+        for path, (names, block) in zip(paths, datas):
+            # a reloaded file keeps its place in the override order
+            self.layers[path] = unpackGuideFile(names, block)
+        self.merge()
+
+    def addLayer(self, path, data):  # type: (str, dict) -> None
+        """Layer guides that are not read from a file, e.g. {'chain1': matrix}, over the current ones."""
+        names = list(data)
+        self.layers[str(path)] = dict((n, p) for p, n in enumerate(names)), RParam.MatrixArray(data[n] for n in names)
+        self.merge()
+
+    def removeLayer(self, path):  # type: (str) -> None
+        del self.layers[str(path)]
+        self.merge()
+
+    def merge(self):
+        self.sources = dict()
+        for path, (positions, _) in self.layers.items():
+            self.sources.update(dict.fromkeys(positions, path))
+        self.matrices = dict()
+
+
+class RigFile(object):
+    """
+    Streamed rig description: a header record followed by one record per component and per connection.
+    Binary files are msgpack records, the fallback is one json record per line.
+    Matrices are stored as packed little-endian float64 blocks.
+    """
+
+    schema = 1
+    binaryMagic = b'RRIG'
+
+    matrixKey = '__matrix__'
+    matricesKey = '__matrices__'
+    matrixFormat = '<16d'
+    matrixSize = struct.calcsize(matrixFormat)
+
+    def __init__(self, path):  # type: (str) -> None
+        self.path = str(path)
+
+    def __repr__(self):
+        return '<{}.{}: {}>'.format(self.__class__.__module__, self.__class__.__name__, self.path)
+
+    # encoding
+
+    @classmethod
+    def packMatrices(cls, matrices):  # type: (list) -> bytes
+        return b''.join(struct.pack(cls.matrixFormat, *matrix) for matrix in matrices)
+
+    @classmethod
+    def unpackMatrices(cls, block):  # type: (bytes) -> list
+        return [
+            RParam.Matrix(*struct.unpack_from(cls.matrixFormat, block, offset))
+            for offset in range(0, len(block), cls.matrixSize)
+        ]
+
+    @classmethod
+    def encodeValue(cls, value, binary=True):
+        if isinstance(value, RParam.Matrix):
+            block = cls.packMatrices((value,))
+            return {cls.matrixKey: block if binary else base64.b64encode(block).decode('ascii')}
+
+        if isinstance(value, RParam.MatrixArray):
+            block = cls.packMatrices(value)
+            return {cls.matricesKey: block if binary else base64.b64encode(block).decode('ascii')}
+
+        if isinstance(value, (list, tuple)):
+            if value and all(isinstance(v, RParam.Matrix) for v in value):
+                block = cls.packMatrices(value)
+                return {cls.matricesKey: block if binary else base64.b64encode(block).decode('ascii')}
+            return [cls.encodeValue(v, binary=binary) for v in value]
+
+        if isinstance(value, dict):
+            return dict((k, cls.encodeValue(v, binary=binary)) for k, v in value.items())
+
+        if isinstance(value, (RParam.Position3, RParam.Color)):
+            return value.aslist()
+
+        return value
+
+    @classmethod
+    def decodeValue(cls, value):
+        if isinstance(value, dict):
+            if cls.matrixKey in value or cls.matricesKey in value:
+                block = value.get(cls.matrixKey, value.get(cls.matricesKey))
+                if not isinstance(block, bytes):
+                    block = base64.b64decode(block)
+                matrices = cls.unpackMatrices(block)
+                return matrices[0] if cls.matrixKey in value else matrices
+            return dict((k, cls.decodeValue(v)) for k, v in value.items())
+
+        if isinstance(value, list):
+            return [cls.decodeValue(v) for v in value]
+
+        return value
+
+    @classmethod
+    def encodeComponent(cls, component, binary=True):  # type: (object, bool) -> dict
+        return {
+            'type': component.__class__.__name__,
+            'data': cls.encodeValue(component.asdict(), binary=binary),
+        }
+
+    @classmethod
+    def decodeComponent(cls, record, componentTypes):  # type: (dict, dict) -> object
+        componentType = componentTypes.get(record['type'])
+        if componentType is None:
+            raise TypeError('Unknown component type -> {}'.format(record['type']))
+        return componentType(**cls.decodeValue(record['data']))
+
+    @classmethod
+    def dumpsComponent(cls, component):  # type: (object) -> str
+        return json.dumps(cls.encodeComponent(component, binary=False), separators=(',', ':'))
+
+    @classmethod
+    def loadsComponent(cls, text, componentTypes):  # type: (str, dict) -> object
+        return cls.decodeComponent(json.loads(text), componentTypes)
+
+    # writing
+
+    def dump(self, name, components, connections, binary=None, force=False):
+        # type: (str, list, list, bool, bool) -> None
+        if os.path.exists(self.path) and not force:
+            raise IOError('File already exists -> {}'.format(self.path))
+
+        if binary is None:
+            binary = msgpack is not None
+        elif binary and msgpack is None:
+            raise ImportError('msgpack is required to write binary rig files')
+
+        components = list(components)
+        componentIndices = dict((id(component), index) for index, component in enumerate(components))
+
+        header = {
+            'schema': self.schema,
+            'name': name,
+            'componentCount': len(components),
+            'connectionCount': len(connections),
+        }
+
+        with open(self.path, 'wb') as f:
+            if binary:
+                f.write(self.binaryMagic)
+                packer = msgpack.Packer(use_bin_type=True)
+                write = lambda record: f.write(packer.pack(record))
+            else:
+                write = lambda record: f.write(json.dumps(record, separators=(',', ':')).encode('utf-8') + b'\n')
+
+            write(header)
+
+            for component in components:
+                write(self.encodeComponent(component, binary=binary))
+
+            for parentComponent, outputIndex, childComponent, inputIndex in connections:
+                write({
+                    'connection': (
+                        componentIndices[id(parentComponent)],
+                        outputIndex,
+                        componentIndices[id(childComponent)],
+                        inputIndex,
+                    )
+                })
+
+    # reading
+
+    def iterRecords(self):
+        with open(self.path, 'rb') as f:
+            binary = f.read(len(self.binaryMagic)) == self.binaryMagic
+
+            if binary:
+                if msgpack is None:
+                    raise ImportError('msgpack is required to read binary rig files -> {}'.format(self.path))
+                records = msgpack.Unpacker(f, raw=False)
+            else:
+                f.seek(0)
+                records = (json.loads(line.decode('utf-8')) for line in f if line.strip())
+
+            header = next(records, None)
+            if not isinstance(header, dict) or 'schema' not in header:
+                raise ValueError('Not a rig file -> {}'.format(self.path))
+            if header['schema'] > self.schema:
+                raise ValueError(
+                    'Unsupported rig file schema {} (max {}) -> {}'.format(header['schema'], self.schema, self.path)
+                )
+
+            yield header
+            for record in records:
+                yield record
+
+    def iterItems(self, componentTypes):  # type: (dict) -> iter
+        """Yield ('header', dict), then ('component', component) and ('connection', tuple) as they are read."""
+        components = list()
+
+        records = self.iterRecords()
+        yield 'header', next(records)
+
+        for record in records:
+            if 'type' in record:
+                component = self.decodeComponent(record, componentTypes)
+                components.append(component)
+                yield 'component', component
+
+            elif 'connection' in record:
+                parentIndex, outputIndex, childIndex, inputIndex = record['connection']
+                yield 'connection', (components[parentIndex], outputIndex, components[childIndex], inputIndex)
+
+    def header(self):  # type: () -> dict
+        records = self.iterRecords()
+        try:
+            return next(records)
+        finally:
+            records.close()
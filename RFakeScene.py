@@ -0,0 +1,654 @@
+"""
+In-memory stand-in for the subset of maya.cmds used by the builders.
+Install it with RScene.cmds.setModule(RFakeScene.FakeCmds()) to build rigs without Maya.
+"""
+import collections
+import json
+import math
+import re
+
+from . import RParam
+
+identity = (
+    1.0, 0.0, 0.0, 0.0,
+    0.0, 1.0, 0.0, 0.0,
+    0.0, 0.0, 1.0, 0.0,
+    0.0, 0.0, 0.0, 1.0,
+)
+
+shapeTypes = ('nurbsCurve', 'locator')
+
+
+def multiply(a, b):  # type: (list, list) -> list
+    return [
+        a[row] * b[column] + a[row + 1] * b[column + 4] + a[row + 2] * b[column + 8] + a[row + 3] * b[column + 12]
+        for row in (0, 4, 8, 12)
+        for column in (0, 1, 2, 3)
+    ]
+
+
+def inverse(m):  # type: (list) -> list
+    # gauss-jordan on an augmented 4x8 matrix
+    rows = [list(m[r * 4:r * 4 + 4]) + [1.0 if r == c else 0.0 for c in range(4)] for r in range(4)]
+    for column in range(4):
+        pivot = max(range(column, 4), key=lambda r: abs(rows[r][column]))
+        if abs(rows[pivot][column]) < 1e-12:
+            raise ValueError('matrix is not invertible')
+        rows[column], rows[pivot] = rows[pivot], rows[column]
+        scale = rows[column][column]
+        rows[column] = [v / scale for v in rows[column]]
+        for r in range(4):
+            if r != column and rows[r][column]:
+                factor = rows[r][column]
+                rows[r] = [v - factor * p for v, p in zip(rows[r], rows[column])]
+    return [v for row in rows for v in row[4:]]
+
+
+def eulerMatrix(rotation):  # type: (tuple) -> list
+    # degrees, maya's xyz rotate order: x is applied first
+    x, y, z = (math.radians(float(v)) for v in rotation)
+    rotateX = [1.0, 0.0, 0.0, 0.0, 0.0, math.cos(x), math.sin(x), 0.0, 0.0, -math.sin(x), math.cos(x), 0.0, 0.0, 0.0, 0.0, 1.0]
+    rotateY = [math.cos(y), 0.0, -math.sin(y), 0.0, 0.0, 1.0, 0.0, 0.0, math.sin(y), 0.0, math.cos(y), 0.0, 0.0, 0.0, 0.0, 1.0]
+    rotateZ = [math.cos(z), math.sin(z), 0.0, 0.0, -math.sin(z), math.cos(z), 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 1.0]
+    return multiply(multiply(rotateX, rotateY), rotateZ)
+
+
+class FakeNode(object):
+
+    def __init__(self, name, nodeType, parent=None):  # type: (str, str, str) -> None
+        self.name = name
+        self.type = nodeType
+        self.parent = parent
+        self.children = list()
+        self.matrix = list(identity)
+        self.attrs = dict()
+        self.userAttrs = dict()
+
+    def __repr__(self):
+        return '<{}.{}: {} ({})>'.format(self.__class__.__module__, self.__class__.__name__, self.name, self.type)
+
+
+class FakeCmds(object):
+
+    def __init__(self):
+        self.calls = collections.Counter()
+        self.new()
+
+    def __getattribute__(self, item):
+        # every attribute access of the fake goes through here, keep it to one set lookup
+        attr = object.__getattribute__(self, item)
+        if item in commands:
+            object.__getattribute__(self, 'calls')[item] += 1
+        return attr
+
+    def new(self):
+        self.nodes = collections.OrderedDict()
+        self.connections = collections.OrderedDict()  # destinationPlug -> sourcePlug
+        self.nodeConnections = collections.defaultdict(collections.OrderedDict)  # node -> destinationPlugs touching it
+        self.selection = list()
+        self.undoState = True
+        self.sceneName = None
+        self.worlds = dict()  # node -> evaluated world matrix
+        self.readers = collections.defaultdict(set)  # node -> nodes whose cached world matrix read it
+        self.evaluating = list()
+
+    # helpers
+
+    def _node(self, name):  # type: (str) -> FakeNode
+        name = str(name).split('|')[-1]
+        if name not in self.nodes:
+            raise ValueError('No object matches name: {}'.format(name))
+        return self.nodes[name]
+
+    def _uniqueName(self, name):  # type: (str) -> str
+        name = str(name).split('|')[-1]
+        if '#' in name:
+            index = 1
+            while name.replace('#', str(index)) in self.nodes:
+                index += 1
+            return name.replace('#', str(index))
+
+        if name not in self.nodes:
+            return name
+
+        base = re.sub(r'\d+$', '', name)
+        index = 1
+        while '{}{}'.format(base, index) in self.nodes:
+            index += 1
+        return '{}{}'.format(base, index)
+
+    def _create(self, name, nodeType, parent=None):  # type: (str, str, str) -> FakeNode
+        node = FakeNode(self._uniqueName(name), nodeType)
+        self.nodes[node.name] = node
+        if parent is not None:
+            self._reparent(node, self._node(parent))
+        return node
+
+    def _reparent(self, node, parent):  # type: (FakeNode, FakeNode) -> None
+        self._edited(node)
+        if node.parent is not None:
+            self.nodes[node.parent].children.remove(node.name)
+        node.parent = None if parent is None else parent.name
+        if parent is not None:
+            parent.children.append(node.name)
+
+    def _local(self, node):  # type: (FakeNode) -> list
+        matrix = self._transformMatrix(node)
+        offsetParentMatrix = self._offsetParentMatrix(node)
+        return matrix if offsetParentMatrix is None else multiply(matrix, offsetParentMatrix)
+
+    def _parentSpace(self, node, parent):  # type: (FakeNode, FakeNode) -> list
+        # space of node.matrix once node lives under parent: offsetParentMatrix * parent world
+        matrix = self._offsetParentMatrix(node) or identity
+        return matrix if parent is None else multiply(matrix, self._world(parent))
+
+    def _plugValue(self, plug):  # type: (str) -> list
+        # value of a matrix plug, evaluated from its source when connected
+        source = self.connections.get(plug)
+        if source is not None:
+            return FakeCmds.getAttr(self, source)
+        nodeName, attr = self._splitPlug(plug)
+        self._read(nodeName)
+        return self.nodes[nodeName].attrs.get(attr)
+
+    def _offsetParentMatrix(self, node):  # type: (FakeNode) -> list
+        return self._plugValue('{}.offsetParentMatrix'.format(node.name))
+
+    def _transformMatrix(self, node):  # type: (FakeNode) -> list
+        # node.matrix, or the translate and rotate given by a parentConstraint (first target, scale is not kept)
+        source = self.connections.get('{}.translate'.format(node.name))
+        if source is None or self.nodes[self._splitPlug(source)[0]].type != 'parentConstraint':
+            return node.matrix
+
+        constraint = self.nodes[self._splitPlug(source)[0]]
+        self._read(constraint.name)
+        offset = eulerMatrix(constraint.attrs.get('target[0].targetOffsetRotate', (0.0, 0.0, 0.0)))
+        offset[12:15] = [float(v) for v in constraint.attrs.get('target[0].targetOffsetTranslate', (0.0, 0.0, 0.0))]
+        world = multiply(offset, self._plugValue('{}.target[0].targetParentMatrix'.format(constraint.name)))
+
+        parent = None if node.parent is None else self.nodes[node.parent]
+        return multiply(world, inverse(self._parentSpace(node, parent)))
+
+    def _matrixSum(self, node):  # type: (FakeNode) -> list
+        self._read(node.name)
+        prefix = '{}.matrixIn['.format(node.name)
+        plugs = set('{}.{}'.format(node.name, attr) for attr in node.attrs if attr.startswith('matrixIn['))
+        plugs.update(d for d in self.nodeConnections.get(node.name, ()) if d.startswith(prefix))
+
+        matrix = list(identity)
+        for plug in sorted(plugs, key=lambda p: int(p[len(prefix):-1])):
+            matrix = multiply(matrix, self._plugValue(plug))
+        return matrix
+
+    def _world(self, node):  # type: (FakeNode) -> list
+        if node.name not in self.worlds:
+            self.evaluating.append(node.name)
+            try:
+                matrix = self._local(node)
+                if node.parent is not None:
+                    matrix = multiply(matrix, self._world(self.nodes[node.parent]))
+            finally:
+                self.evaluating.pop()
+            self.worlds[node.name] = matrix
+        self._read(node.name)
+        return self.worlds[node.name]
+
+    def _read(self, name):  # type: (str) -> None
+        # the world matrix being evaluated depends on this node, editing it drops that matrix
+        if self.evaluating and self.evaluating[-1] != name:
+            self.readers[name].add(self.evaluating[-1])
+
+    def _descendants(self, node):  # type: (FakeNode) -> list
+        # deepest first, like listRelatives(allDescendents=True)
+        result = list()
+        for childName in reversed(node.children):
+            child = self.nodes[childName]
+            result += self._descendants(child)
+            result.append(child)
+        return result
+
+    def _path(self, node):  # type: (FakeNode) -> str
+        names = [node.name]
+        while node.parent is not None:
+            node = self.nodes[node.parent]
+            names.insert(0, node.name)
+        return '|' + '|'.join(names)
+
+    def _edited(self, node):  # type: (FakeNode) -> None
+        # drop the cached world matrices depending on the node, like maya's dirty propagation
+        names = [node.name]
+        while names:
+            name = names.pop()
+            self.worlds.pop(name, None)
+            names += self.readers.pop(name, ())
+
+    def _connect(self, source, destination):  # type: (str, str) -> None
+        # a node being renamed is not registered under its new name yet, rename drops its matrices itself
+        destinationNode = self.nodes.get(self._splitPlug(destination)[0])
+        if destinationNode is not None:
+            self._edited(destinationNode)
+        self.connections[destination] = source
+        for plug in (source, destination):
+            self.nodeConnections[self._splitPlug(plug)[0]][destination] = None
+
+    def _disconnect(self, destination):  # type: (str) -> None
+        destinationNode = self.nodes.get(self._splitPlug(destination)[0])
+        if destinationNode is not None:
+            self._edited(destinationNode)
+        source = self.connections.pop(destination, None)
+        for plug in (source, destination):
+            if plug is not None:
+                self.nodeConnections.get(self._splitPlug(plug)[0], dict()).pop(destination, None)
+
+    def _checkWritable(self, node, attrs):  # type: (FakeNode, tuple) -> None
+        # like maya, a plug driven by a connection (or one of its children) can not be set
+        for destination in self.nodeConnections.get(node.name, ()):
+            destinationNode, destinationAttr = self._splitPlug(destination)
+            if destinationNode != node.name:
+                continue
+            for attr in attrs:
+                if destinationAttr == attr or destinationAttr[:-1] == attr and destinationAttr[-1] in 'XYZ':
+                    raise RuntimeError('The attribute \'{}\' is locked or connected and cannot be modified.'.format(destination))
+
+    def _nodeConnections(self, name):  # type: (str) -> list
+        # (sourcePlug, destinationPlug) pairs touching a node, in connection order
+        return [(self.connections[d], d) for d in self.nodeConnections.get(name, ())]
+
+    @staticmethod
+    def _splitPlug(plug):  # type: (str) -> tuple
+        name, _, attr = str(plug).partition('.')
+        return name.split('|')[-1], attr
+
+    @staticmethod
+    def _asList(items):
+        if items is None:
+            return list()
+        if isinstance(items, (list, tuple)):
+            result = list()
+            for item in items:
+                result += FakeCmds._asList(item)
+            return result
+        return [str(items)]
+
+    # scene
+
+    def file(self, *args, **kwargs):
+        if kwargs.get('new'):
+            self.new()
+        elif 'rename' in kwargs:
+            self.sceneName = kwargs['rename']
+        elif kwargs.get('save'):
+            with open(self.sceneName, 'w') as f:
+                json.dump(self.asdict(), f)
+        return self.sceneName
+
+    def asdict(self):  # type: () -> dict
+        return {
+            'nodes': [
+                {'name': n.name, 'type': n.type, 'parent': n.parent, 'matrix': n.matrix, 'attrs': n.attrs}
+                for n in self.nodes.values()
+            ],
+            'connections': [(s, d) for d, s in self.connections.items()],
+        }
+
+    def undoInfo(self, *args, **kwargs):
+        if kwargs.get('query') or kwargs.get('q'):
+            return self.undoState
+        for key in ('state', 'stateWithoutFlush'):
+            if key in kwargs:
+                self.undoState = bool(kwargs[key])
+        return None
+
+    def select(self, *items, **kwargs):
+        if kwargs.get('clear'):
+            self.selection = list()
+        else:
+            self.selection = [self._node(i).name for i in self._asList(items)]
+
+    def ls(self, *items, **kwargs):
+        nodeType = kwargs.get('type')
+        if kwargs.get('selection') or kwargs.get('sl'):
+            names = list(self.selection)
+        elif items:
+            names = [i.split('|')[-1] for i in self._asList(items)]
+        else:
+            names = list(self.nodes)
+        return [
+            n for n in names
+            if n in self.nodes and (nodeType is None or self.nodes[n].type == nodeType)
+        ]
+
+    def objExists(self, name):
+        name = str(name)
+        if '.' in name:
+            nodeName, attr = self._splitPlug(name)
+            return nodeName in self.nodes and attr.split('[')[0] in self.nodes[nodeName].userAttrs
+        return name.split('|')[-1] in self.nodes
+
+    def nodeType(self, name):
+        return self._node(name).type
+
+    def delete(self, *items):
+        for name in self._asList(items):
+            name = name.split('|')[-1]
+            if name not in self.nodes:
+                continue
+            node = self.nodes[name]
+            self._edited(node)
+            for each in self._descendants(node) + [node]:
+                if each.parent is not None and each.parent in self.nodes:
+                    self.nodes[each.parent].children.remove(each.name)
+                del self.nodes[each.name]
+                for destination in list(self.nodeConnections.pop(each.name, ())):
+                    self._disconnect(destination)
+        self.selection = [s for s in self.selection if s in self.nodes]
+
+    def rename(self, old, new):
+        node = self._node(old)
+        newName = self._uniqueName(new) if new != node.name else new
+        self._edited(node)
+        del self.nodes[node.name]
+        if node.parent is not None:
+            siblings = self.nodes[node.parent].children
+            siblings[siblings.index(node.name)] = newName
+        for childName in node.children:
+            self.nodes[childName].parent = newName
+
+        def renamed(plug):
+            nodeName, attr = self._splitPlug(plug)
+            return '{}.{}'.format(newName, attr) if nodeName == node.name else plug
+
+        # plugs are renamed in place, the node's matrices were dropped above
+        index = collections.OrderedDict()
+        for s, d in self._nodeConnections(node.name):
+            newDestination = renamed(d)
+            del self.connections[d]
+            self.connections[newDestination] = renamed(s)
+            for other in set(self._splitPlug(plug)[0] for plug in (s, d)) - {node.name}:
+                self.nodeConnections[other].pop(d, None)
+                self.nodeConnections[other][newDestination] = None
+            index[newDestination] = None
+        self.nodeConnections.pop(node.name, None)
+        if index:
+            self.nodeConnections[newName] = index
+        self.selection = [newName if s == node.name else s for s in self.selection]
+        node.name = newName
+        self.nodes[newName] = node
+        return newName
+
+    # creation
+
+    def createNode(self, nodeType, name=None, parent=None, **kwargs):
+        return self._create(name or '{}#'.format(nodeType), nodeType, parent=parent).name
+
+    def group(self, *items, **kwargs):
+        node = self._create(kwargs.get('name', 'group#'), 'transform', parent=kwargs.get('parent'))
+        if not kwargs.get('empty'):
+            FakeCmds.parent(self, *(self._asList(items) + [node.name]))
+        self.selection = [node.name]
+        return node.name
+
+    def circle(self, name='nurbsCircle#', **kwargs):
+        node = self._create(name, 'transform')
+        self._create('{}Shape'.format(node.name), 'nurbsCurve', parent=node.name)
+        self.selection = [node.name]
+        return [node.name]
+
+    def spaceLocator(self, name='locator#', **kwargs):
+        node = self._create(name, 'transform')
+        self._create('{}Shape'.format(node.name), 'locator', parent=node.name)
+        self.selection = [node.name]
+        return [node.name]
+
+    def joint(self, *args, **kwargs):
+        parent = None
+        if self.selection and self.nodes[self.selection[-1]].type in ('transform', 'joint'):
+            parent = self.selection[-1]
+        node = self._create(kwargs.get('name', 'joint#'), 'joint', parent=parent)
+        self.selection = [node.name]
+        return node.name
+
+    def controller(self, *items, **kwargs):
+        for name in self._asList(items):
+            tag = self._create('{}_tag'.format(name.split('|')[-1]), 'controller')
+            self._connect('{}.message'.format(name), '{}.controllerObject'.format(tag.name))
+
+    def parentConstraint(self, *items, **kwargs):
+        items = self._asList(items)
+        parents, child = items[:-1], items[-1]
+        # with maintain offset, the child keeps its world matrix relative to the first target
+        offset = list(identity)
+        if kwargs.get('maintainOffset') or kwargs.get('mo'):
+            offset = multiply(self._world(self._node(child)), inverse(self._world(self._node(parents[0]))))
+        offset = RParam.Matrix(*offset)
+
+        constraint = self._create('{}_parentConstraint1'.format(child.split('|')[-1]), 'parentConstraint', parent=child)
+        constraint.attrs['target[0].targetOffsetTranslate'] = list(offset.translation())
+        constraint.attrs['target[0].targetOffsetRotate'] = list(offset.eulerRotation())
+        for index, parent in enumerate(parents):
+            FakeCmds.connectAttr(self, '{}.worldMatrix[0]'.format(parent), '{}.target[{}].targetParentMatrix'.format(constraint.name, index))
+        for attr in ('translate', 'rotate'):
+            FakeCmds.connectAttr(self, '{}.constraint{}'.format(constraint.name, attr.title()), '{}.{}'.format(child, attr))
+        return [constraint.name]
+
+    def duplicate(self, *items, **kwargs):
+        result = list()
+        for name in self._asList(items):
+            source = self._node(name)
+            mapping = dict()
+
+            def copy(node, parent):
+                duplicated = self._create(node.name, node.type, parent=parent)
+                duplicated.matrix = list(node.matrix)
+                duplicated.attrs = dict(node.attrs)
+                duplicated.userAttrs = dict(node.userAttrs)
+                mapping[node.name] = duplicated.name
+                for childName in node.children:
+                    copy(self.nodes[childName], duplicated.name)
+                return duplicated
+
+            top = copy(source, source.parent)
+
+            internal = collections.OrderedDict()
+            for nodeName in mapping:
+                for s, d in self._nodeConnections(nodeName):
+                    if self._splitPlug(s)[0] in mapping and self._splitPlug(d)[0] in mapping:
+                        internal[d] = s
+            for d, s in list(internal.items()):
+                sourceNode, sourceAttr = self._splitPlug(s)
+                destinationNode, destinationAttr = self._splitPlug(d)
+                self._connect(
+                    '{}.{}'.format(mapping[sourceNode], sourceAttr),
+                    '{}.{}'.format(mapping[destinationNode], destinationAttr),
+                )
+
+            result.append(top.name)
+            result += [n.name for n in self._descendants(top)]
+        return result
+
+    def sets(self, *items, **kwargs):
+        node = self._create(kwargs.get('name', 'set#'), 'objectSet')
+        node.attrs['dagSetMembers'] = [self._node(i).name for i in self._asList(items)]
+        return node.name
+
+    # hierarchy
+
+    def parent(self, *items, **kwargs):
+        items = self._asList(items)
+        if kwargs.get('world'):
+            children, parent = items, None
+        else:
+            children, parent = items[:-1], self._node(items[-1])
+
+        result = list()
+        for name in children:
+            node = self._node(name)
+            if not kwargs.get('relative'):
+                node.matrix = multiply(self._world(node), inverse(self._parentSpace(node, parent)))
+            self._reparent(node, parent)
+            result.append(node.name)
+        return result
+
+    def listRelatives(self, *items, **kwargs):
+        result = list()
+        for name in self._asList(items):
+            node = self._node(name)
+            if kwargs.get('parent') or kwargs.get('p'):
+                relatives = [self.nodes[node.parent]] if node.parent is not None else []
+            elif kwargs.get('allDescendents') or kwargs.get('ad'):
+                relatives = self._descendants(node)
+            else:
+                relatives = [self.nodes[c] for c in node.children]
+
+            if kwargs.get('shapes') or kwargs.get('s'):
+                relatives = [r for r in relatives if r.type in shapeTypes]
+            if kwargs.get('type'):
+                relatives = [r for r in relatives if r.type == kwargs['type']]
+
+            result += [self._path(r) if kwargs.get('fullPath') else r.name for r in relatives]
+        return result or None
+
+    # transforms
+
+    def xform(self, *items, **kwargs):
+        names = self._asList(items)
+        worldSpace = kwargs.get('worldSpace') or kwargs.get('ws')
+
+        if kwargs.get('query') or kwargs.get('q'):
+            result = list()
+            for name in names:
+                node = self._node(name)
+                matrix = self._world(node) if worldSpace else node.matrix
+                if kwargs.get('matrix') or kwargs.get('m'):
+                    result += matrix
+                elif kwargs.get('translation') or kwargs.get('t'):
+                    result += matrix[12:15]
+            return result
+
+        for name in names:
+            node = self._node(name)
+            self._checkWritable(node, ('translate', 'rotate', 'scale'))
+            self._edited(node)
+            if 'matrix' in kwargs or 'm' in kwargs:
+                matrix = [float(v) for v in kwargs.get('matrix', kwargs.get('m'))]
+                if worldSpace:
+                    parent = None if node.parent is None else self.nodes[node.parent]
+                    matrix = multiply(matrix, inverse(self._parentSpace(node, parent)))
+                node.matrix = matrix
+            elif 'translation' in kwargs or 't' in kwargs:
+                node.matrix[12:15] = [float(v) for v in kwargs.get('translation', kwargs.get('t'))]
+
+    def setPlacements(self, nodes, matrices, offsetParent=False):
+        # bulk extension, not part of maya.cmds: RScene.setPlacements uses it when the backend has it
+        for name, matrix in zip(nodes, matrices):
+            if offsetParent:
+                FakeCmds.setAttr(self, '{}.offsetParentMatrix'.format(name), matrix, type='matrix')
+            else:
+                FakeCmds.xform(self, name, matrix=matrix, worldSpace=True)
+
+    # attributes
+
+    def addAttr(self, *items, **kwargs):
+        longName = kwargs.get('longName', kwargs.get('ln'))
+        for name in self._asList(items):
+            node = self._node(name)
+            if longName in node.userAttrs:
+                raise RuntimeError('Found more than one attribute with the name {}'.format(longName))
+            node.userAttrs[longName] = {
+                'attributeType': kwargs.get('attributeType', kwargs.get('at')),
+                'dataType': kwargs.get('dataType', kwargs.get('dt')),
+                'multi': bool(kwargs.get('multi', kwargs.get('m', False))),
+            }
+
+    def setAttr(self, plug, *values, **kwargs):
+        nodeName, attr = self._splitPlug(plug)
+        node = self._node(nodeName)
+        if values:
+            self._checkWritable(node, (attr,))
+            self._edited(node)
+            value = values[0] if len(values) == 1 else list(values)
+            if attr in ('offsetParentMatrix', 'matrix') and kwargs.get('type') == 'matrix':
+                value = [float(v) for v in value]
+                if attr == 'matrix':
+                    node.matrix = value
+            node.attrs[attr] = value
+        for flag in ('lock', 'keyable'):
+            if flag in kwargs:
+                node.attrs['{}:{}'.format(attr, flag)] = kwargs[flag]
+
+    def getAttr(self, plug, **kwargs):
+        nodeName, attr = self._splitPlug(plug)
+        node = self._node(nodeName)
+        if attr.startswith('worldMatrix'):
+            return list(self._world(node))
+        if attr.startswith('worldInverseMatrix'):
+            return inverse(self._world(node))
+        if attr.startswith('parentInverseMatrix'):
+            return list(identity) if node.parent is None else inverse(self._world(self.nodes[node.parent]))
+        if attr == 'matrixSum':
+            return self._matrixSum(node)
+        if attr == 'offsetParentMatrix':
+            return self._offsetParentMatrix(node)
+        if attr == 'matrix':
+            return list(node.matrix)
+        if attr.split('[')[0] in node.userAttrs and node.userAttrs[attr.split('[')[0]]['multi'] and '[' not in attr:
+            prefix = '{}.{}['.format(node.name, attr)
+            return [d for d in self.nodeConnections.get(node.name, ()) if d.startswith(prefix)]
+        return node.attrs.get(attr)
+
+    def connectAttr(self, source, destination, **kwargs):
+        sourceNode, sourceAttr = self._splitPlug(source)
+        destinationNode, destinationAttr = self._splitPlug(destination)
+        self._node(sourceNode)
+        self._node(destinationNode)
+
+        if kwargs.get('nextAvailable') or kwargs.get('na'):
+            prefix = '{}.{}['.format(destinationNode, destinationAttr)
+            used = [d for d in self.nodeConnections.get(destinationNode, ()) if d.startswith(prefix)]
+            destinationAttr = '{}[{}]'.format(destinationAttr, len(used))
+
+        source = '{}.{}'.format(sourceNode, sourceAttr)
+        destination = '{}.{}'.format(destinationNode, destinationAttr)
+        if destination in self.connections:
+            if not kwargs.get('force') and not kwargs.get('f'):
+                raise RuntimeError('{} is already connected'.format(destination))
+            self._disconnect(destination)
+        self._connect(source, destination)
+
+    def listConnections(self, item, **kwargs):
+        source = kwargs.get('source', kwargs.get('s', True))
+        destination = kwargs.get('destination', kwargs.get('d', True))
+        plugs = kwargs.get('plugs', kwargs.get('p', False))
+        connections = kwargs.get('connections', kwargs.get('c', False))
+        nodeType = kwargs.get('type', kwargs.get('t'))
+
+        nodeName, attr = self._splitPlug(item)
+        self._node(nodeName)
+
+        def matches(plug):
+            plugNode, plugAttr = self._splitPlug(plug)
+            if plugNode != nodeName:
+                return False
+            return not attr or plugAttr == attr or plugAttr.startswith('{}['.format(attr))
+
+        result = list()
+        for s, d in self._nodeConnections(nodeName):
+            if destination and matches(s):
+                local, other = s, d
+            elif source and matches(d):
+                local, other = d, s
+            else:
+                continue
+            if nodeType is not None and self.nodes[self._splitPlug(other)[0]].type != nodeType:
+                continue
+            if connections:
+                result.append(local)
+            result.append(other if plugs else self._splitPlug(other)[0])
+        return result or None
+
+
+# the scene commands counted in FakeCmds.calls
+commands = frozenset(
+    name for name, value in vars(FakeCmds).items()
+    if not name.startswith('_') and callable(value) and name != 'new'
+)
@@ -0,0 +1,297 @@
+import collections
+import heapq
+
+from . import RObj
+from . import RParam
+from .RScene import cmds
+
+
+class GuideSync(object):
+    """
+    Pushes guide transforms onto the ctrl buffers built from them, without rebuilding the rig.
+    Change events are coalesced until the next flush, which runs once per idle tick when started in Maya.
+    Feed events by hand and call flush() to drive it without Maya.
+    """
+
+    guideAttrs = 'translate', 'rotate', 'scale'
+
+    def __init__(self, rig):  # type: (RRig.RRig) -> None
+        self.rig = rig
+
+        self.buffers = collections.defaultdict(list)  # guide -> buffers placed from it
+        self.dependents = collections.defaultdict(list)  # guide -> guides whose buffers live under its buffer
+        self.order = dict()  # guide -> build order, parents before children
+        self.offsetParented = set()  # bufferless ctrls, placed through their offsetParentMatrix
+        self.drivers = dict()  # buffer -> (constraint or multMatrix, driving parent), (None, None) when free
+
+        for component in rig.components:
+            for instance in self.instances(component):
+                self.addComponent(instance)
+        for connection in rig.connections:
+            self.addConnection(*connection)
+        self.sortGuides()
+
+        self.pending = collections.OrderedDict()  # guide -> matrix, or None to query it
+        self.scheduled = False
+        self.deferred = None
+        self.jobs = list()
+
+    def addComponent(self, component):  # type: (RComp.RMayaComponent) -> None
+        placed = [(g, b) for g, b in zip(component.guides, component.ctrlBuffers) if g is not None]
+
+        for position, (guide, buffer_) in enumerate(placed):
+            self.order.setdefault(guide, len(self.order))
+            self.buffers[guide].append(buffer_)
+            if component.bufferless:
+                self.offsetParented.add(buffer_)
+            # later buffers of a component may be parented under earlier ones, keep them on their guides
+            self.dependents[guide] += [g for g, _ in placed[position + 1:]]
+
+    def addConnection(self, parentComponent, outputIndex, childComponent, inputIndex):
+        # type: (RComp.RMayaComponent, int, RComp.RMayaComponent, int) -> None
+        # the driven input follows the parent's outputs, its offset to them is recomputed when they move
+        childInput = str(childComponent.inputs[inputIndex])
+        driven = [guide for guide, buffers in self.buffers.items() if childInput in map(str, buffers)]
+        if not driven:
+            # an input placed from no guide still carries the guided buffers under it
+            driven = [g for instance in self.instances(childComponent) for g in instance.guides if g is not None]
+
+        for instance in self.instances(parentComponent):
+            for guide in instance.guides:
+                if guide is not None:
+                    self.dependents[guide] += [g for g in driven if g != guide and g not in self.dependents[guide]]
+
+    def sortGuides(self):
+        # parents before the guides depending on them, build order otherwise
+        incoming = collections.Counter(g for guides in list(self.dependents.values()) for g in guides)
+        ready = [(position, guide) for guide, position in self.order.items() if not incoming[guide]]
+        heapq.heapify(ready)
+
+        order = dict()
+        while ready:
+            _, guide = heapq.heappop(ready)
+            order[guide] = len(order)
+            for dependent in self.dependents[guide]:
+                incoming[dependent] -= 1
+                if not incoming[dependent]:
+                    heapq.heappush(ready, (self.order[dependent], dependent))
+
+        # guides caught in a cycle keep their build order, after the others
+        for guide in sorted(set(self.order) - set(order), key=self.order.get):
+            order[guide] = len(order)
+        self.order = order
+
+    @staticmethod
+    def instances(component):  # type: (RComp.RMayaComponent) -> tuple
+        return getattr(component, 'instances', None) or (component,)
+
+    def guides(self):  # type: () -> list
+        return sorted(self.buffers, key=self.order.get)
+
+    # events
+
+    def push(self, guide, matrix=None):  # type: (str, list) -> None
+        guide = str(guide)
+        if guide not in self.buffers:
+            return
+
+        self.pending.pop(guide, None)
+        self.pending[guide] = None if matrix is None else list(matrix)
+        self.schedule()
+
+    def feed(self, events):  # type: (iter) -> None
+        # events are guide names or (guide, matrix) pairs
+        for event in events:
+            if isinstance(event, (list, tuple)):
+                self.push(*event)
+            else:
+                self.push(event)
+
+    def schedule(self):
+        if self.deferred is not None and not self.scheduled:
+            self.scheduled = True
+            self.deferred(self.flush)
+
+    def flush(self):  # type: () -> int
+        pending, self.pending = self.pending, collections.OrderedDict()
+        self.scheduled = False
+        if not pending:
+            return 0
+
+        # dependents of dependents move too: buffers under a moved buffer, components driven by moved outputs
+        affected = set(pending)
+        stack = list(pending)
+        while stack:
+            for dependent in self.dependents[stack.pop()]:
+                if dependent not in affected:
+                    affected.add(dependent)
+                    stack.append(dependent)
+        affected = sorted(affected, key=self.order.get)
+
+        matrices = dict((guide, matrix) for guide, matrix in pending.items() if matrix is not None)
+
+        # guides without a matrix in their event are read in one query
+        missing = [guide for guide in affected if guide not in matrices]
+        if missing:
+            values = cmds.xform(missing, query=True, matrix=True, worldSpace=True)
+            for position, guide in enumerate(missing):
+                matrices[guide] = values[position * 16:(position + 1) * 16]
+
+        updates = 0
+        for guide in affected:
+            for buffer_ in self.buffers[guide]:
+                self.place(buffer_, matrices[guide])
+                updates += 1
+
+        return updates
+
+    def driver(self, buffer_):  # type: (str) -> tuple
+        # buffers driven by a rig connection can not be written, their connection offset is moved instead
+        if buffer_ not in self.drivers:
+            if buffer_ in self.offsetParented:
+                plug = '{}.offsetParentMatrix'.format(buffer_)
+                nodes = cmds.listConnections(plug, source=True, destination=False, type='multMatrix')
+                parentPlug = '{}.matrixIn[1]'
+            else:
+                nodes = cmds.listRelatives(buffer_, type='parentConstraint')
+                parentPlug = '{}.target[0].targetParentMatrix'
+
+            driver = parent = None
+            if nodes:
+                driver = nodes[0]
+                parent = (cmds.listConnections(parentPlug.format(driver), source=True, destination=False) or [None])[0]
+            self.drivers[buffer_] = driver, parent
+
+        return self.drivers[buffer_]
+
+    def place(self, buffer_, matrix):  # type: (str, list) -> None
+        driver, parent = self.driver(buffer_)
+
+        if driver is None:
+            if buffer_ in self.offsetParented:
+                self.placeOffsetParented(buffer_, matrix)
+            else:
+                cmds.xform(buffer_, matrix=matrix, worldSpace=True)
+            return
+
+        parentMatrix = cmds.xform(parent, query=True, matrix=True, worldSpace=True)
+        offset = RParam.Matrix(*matrix).dot(RParam.Matrix(*parentMatrix).inverse())
+        if buffer_ in self.offsetParented:
+            cmds.setAttr('{}.matrixIn[0]'.format(driver), offset.aslist(), type='matrix')
+        else:
+            RObj.setParentConstraintOffset(driver, offset)
+
+    @staticmethod
+    def placeOffsetParented(ctrl, matrix):  # type: (str, list) -> None
+        # parents are updated first, so their world matrix is already the new one
+        matrix = RParam.Matrix(*matrix)
+        parent = cmds.listRelatives(ctrl, parent=True)
+        if parent:
+            parentMatrix = cmds.xform(parent[0], query=True, matrix=True, worldSpace=True)
+            matrix = matrix.dot(RParam.Matrix(*parentMatrix).inverse())
+        RObj.setOffsetParentMatrix(ctrl, matrix)
+
+    # maya
+
+    def start(self):
+        import maya.utils
+
+        self.stop()
+        self.deferred = maya.utils.executeDeferred
+
+        for guide in self.guides():
+            for attr in self.guideAttrs:
+                job = cmds.scriptJob(
+                    attributeChange=('{}.{}'.format(guide, attr), lambda guide=guide: self.push(guide)),
+                )
+                self.jobs.append(job)
+
+    def stop(self):
+        for job in self.jobs:
+            if cmds.scriptJob(exists=job):
+                cmds.scriptJob(kill=job, force=True)
+
+        self.jobs = list()
+        self.deferred = None
+        self.pending.clear()
+
+
+def test(count=30, events=400, seed=0):
+    """
+    Move guides on generated rigs built on the fake backend, buffered and bufferless, and check every buffer
+    ends up on its guide, as a rebuild would put it: one parent guide alone, then a random stream of events.
+    """
+    import random
+
+    from . import RFakeScene, RWorkload
+
+    def close(a, b):
+        return all(abs(x - y) < 1e-5 for x, y in zip(a, b))
+
+    def worldMatrix(node):
+        return cmds.xform(node, query=True, matrix=True, worldSpace=True)
+
+    def checkPlaced(sync):
+        for guide in sync.guides():
+            for buffer_ in sync.buffers[guide]:
+                assert close(worldMatrix(buffer_), worldMatrix(guide)), '{} is away from {}'.format(buffer_, guide)
+
+    cmds.setModule(RFakeScene.FakeCmds())
+    try:
+        for bufferless in (False, True):
+            rand = random.Random(seed)
+            generator = RWorkload.WorkloadGenerator(seed=seed)
+            rig, guides = generator.generate(count)
+            for component in rig.components:
+                component.bufferless = bufferless
+
+            cmds.file(new=True, force=True)
+            for guide, matrix in guides.items():
+                cmds.spaceLocator(name=guide)
+                cmds.xform(guide, matrix=matrix, worldSpace=True)
+            rig.create()
+
+            sync = GuideSync(rig)
+            checkPlaced(sync)
+
+            # the guide of a parent output alone: the components driven by that output keep their guides too
+            parentComponent, outputIndex, _, _ = next(
+                connection for connection in rig.connections
+                if len(connection[0].guides) > connection[1] and sync.driver(str(connection[2].inputs[connection[3]]))[0]
+            )
+            parentGuide = parentComponent.guides[outputIndex]
+            matrix = worldMatrix(parentGuide)
+            matrix[12] += 3.0
+            cmds.xform(parentGuide, matrix=matrix, worldSpace=True)
+            sync.push(parentGuide)
+            assert sync.flush() > len(sync.buffers[parentGuide])
+            checkPlaced(sync)
+
+            # guides are read back from the scene or carried by their event, often several times
+            moved = set()
+            stream = list()
+            for _ in range(events):
+                guide = rand.choice(sync.guides())
+                matrix = list(generator.randomMatrix(rand).aslist())
+                cmds.xform(guide, matrix=matrix, worldSpace=True)
+                stream.append(guide if rand.random() < .5 else (guide, matrix))
+                moved.add(guide)
+            sync.feed(stream)
+
+            affected = set(moved)
+            stack = list(moved)
+            while stack:
+                dependents = set(sync.dependents[stack.pop()]) - affected
+                affected.update(dependents)
+                stack += dependents
+
+            # writing a connected plug raises, every buffer goes through the path matching its connection
+            updates = sync.flush()
+            assert updates == sum(len(sync.buffers[guide]) for guide in affected), updates
+            assert sync.flush() == 0
+            checkPlaced(sync)
+
+            driven = [b for guide in affected for b in sync.buffers[guide] if sync.driver(b)[0] is not None]
+            assert driven, 'no connected root buffer was moved'
+    finally:
+        cmds.setModule(None)
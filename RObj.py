@@ -1,5 +1,5 @@
-from . import RParam
-from maya import cmds
+from . import RParam, RScene
+from .RScene import cmds
 
 
 def createMatrixConstraint(parents, child, interface=None):
@@ -13,8 +13,9 @@ def createMatrixConstraint(parents, child, interface=None):
     cmds.connectAttr('{}.worldMatrix[0]'.format(parents[0]), '{}.matrixIn[1]'.format(multMatrix))
     cmds.connectAttr('{}.matrixSum'.format(multMatrix), '{}.inputMatrix'.format(decomposeMatrix))
 
-    parentInverseWorldMatrix = RParam.Matrix(*cmds.getAttr('{}.worldInverseMatrix[0]'.format(parents[0])))
-    childWorldMatrix = RParam.Matrix(*cmds.getAttr('{}.worldMatrix[0]'.format(child)))
+    parentWorldMatrix, childWorldMatrix = RScene.getWorldMatrices((parents[0], child))
+    parentInverseWorldMatrix = RParam.Matrix(*parentWorldMatrix).inverse()
+    childWorldMatrix = RParam.Matrix(*childWorldMatrix)
 
     childLMatrix = parentInverseWorldMatrix * childWorldMatrix
 
@@ -31,9 +32,38 @@ def createMatrixConstraint(parents, child, interface=None):
         )
 
 
+def createOffsetParentConstraint(parent, child):
+    # drives child.offsetParentMatrix so its own transform attributes stay free for animation,
+    # the child's parent inverse keeps it in place when it does not live under the world
+    parentWorldMatrix, childWorldMatrix = RScene.getWorldMatrices((parent, child))
+    offsetMatrix = RParam.Matrix(*childWorldMatrix).dot(RParam.Matrix(*parentWorldMatrix).inverse())
+
+    multMatrix = cmds.createNode('multMatrix', name='{}_offsetMultMatrix'.format(child))
+    cmds.setAttr('{}.matrixIn[0]'.format(multMatrix), offsetMatrix.aslist(), type='matrix')
+    cmds.connectAttr('{}.worldMatrix[0]'.format(parent), '{}.matrixIn[1]'.format(multMatrix))
+    cmds.connectAttr('{}.parentInverseMatrix[0]'.format(child), '{}.matrixIn[2]'.format(multMatrix))
+    # the offset matches the child's current placement, it does not move
+    with RScene.keepingWorldMatrices(child):
+        cmds.connectAttr('{}.matrixSum'.format(multMatrix), '{}.offsetParentMatrix'.format(child))
+
+    return multMatrix
+
+
+def setParentConstraintOffset(constraint, matrix, targetIndex=0):  # type: (str, RParam.Matrix, int) -> None
+    # offset of the constrained object in the space of the target, as maintainOffset computes it
+    matrix = RParam.Matrix(*matrix)
+    targetPlug = '{}.target[{}]'.format(constraint, targetIndex)
+    cmds.setAttr('{}.targetOffsetTranslate'.format(targetPlug), *matrix.translation())
+    cmds.setAttr('{}.targetOffsetRotate'.format(targetPlug), *matrix.eulerRotation())
+
+
+def setOffsetParentMatrix(obj, matrix):  # type: (str, RParam.Matrix) -> None
+    cmds.setAttr('{}.offsetParentMatrix'.format(obj), list(matrix), type='matrix')
+
+
 def createBuffer(obj, bufferSuffix='Buffer'):
     buffer_ = cmds.group(empty=True, name='{}{}'.format(obj, bufferSuffix))
-    objMatrix = cmds.xform(obj, q=True, matrix=True, worldSpace=True)
+    objMatrix = RScene.getWorldMatrix(obj)
     cmds.xform(buffer_, matrix=objMatrix)
 
     objParents = cmds.listRelatives(obj, parent=True)
@@ -76,12 +106,17 @@ class Controller(object):
 
         cmds.setAttr('{}.v'.format(name), lock=True, keyable=False)
 
-        for shape in cmds.listRelatives(name, children=True, shapes=True):
+        controller = cls(name)
+        controller.setColor(color)
+        return controller
+
+    def setColor(self, color):  # type: (RParam.Color) -> None
+        color = RParam.Color(*color)
+
+        for shape in cmds.listRelatives(self.name, children=True, shapes=True, fullPath=True) or list():
             cmds.setAttr('{}.overrideEnabled'.format(shape), True)
             cmds.setAttr('{}.overrideRGBColors'.format(shape), True)
 
             cmds.setAttr('{}.overrideColorR'.format(shape), color.r / 255.0)
             cmds.setAttr('{}.overrideColorG'.format(shape), color.g / 255.0)
             cmds.setAttr('{}.overrideColorB'.format(shape), color.b / 255.0)
-
-        return cls(name)
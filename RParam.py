@@ -1,4 +1,12 @@
+import array
+import collections
 import math
+import weakref
+
+try:
+    long
+except NameError:  # python 3
+    long = int
 
 
 class Position3(object):
@@ -26,7 +34,9 @@ class Position3(object):
         return vectorCopy
 
     def mirror(self, mirrorAxis='x'):
-        if mirrorAxis == 'x':
+        if isinstance(mirrorAxis, Plane):
+            self.x, self.y, self.z = mirrorAxis.mirrorPoint(self.aslist())
+        elif mirrorAxis == 'x':
             self.x *= -1
         elif mirrorAxis == 'y':
             self.y *= -1
@@ -45,6 +55,13 @@ class Vector3(Position3):
         if magnitude <= 0.0:
             raise ValueError('magnitude is equal or less than 0.0 -> {}'.format(magnitude))
 
+    def mirror(self, mirrorAxis='x'):
+        # a vector is a direction, an offset plane does not move it
+        if isinstance(mirrorAxis, Plane):
+            self.x, self.y, self.z = mirrorAxis.mirrorVector(self.aslist())
+        else:
+            super(Vector3, self).mirror(mirrorAxis)
+
     def magnitude(self):
         return math.sqrt(self.x ** 2.0 + self.y ** 2.0 + self.z ** 2.0)
 
@@ -62,6 +79,13 @@ class Vector3(Position3):
 
 class Matrix(object):
 
+    attributeNames = (
+        'xx', 'xy', 'xz', 'xw',
+        'yx', 'yy', 'yz', 'yw',
+        'zx', 'zy', 'zz', 'zw',
+        'px', 'py', 'pz', 'pw',
+    )
+
     def __init__(
             self,
             xx=1.0, xy=0.0, xz=0.0, xw=0.0,
@@ -143,8 +167,14 @@ class Matrix(object):
         matrixCopy.mirror(mirrorAxis)
         return matrixCopy
 
-    def mirror(self, mirrorAxis='x'):  # type: (basestring) -> None
-        if mirrorAxis == 'x':
+    def mirror(self, mirrorAxis='x'):  # type: (basestring|Plane) -> None
+        if isinstance(mirrorAxis, Plane):
+            values = list(self.aslist())
+            mirrorAxis.mirrorMatrixValues(values)
+            for name, value in zip(self.attributeNames, values):
+                setattr(self, name, value)
+
+        elif mirrorAxis == 'x':
             self.xx *= -1
             self.yx *= -1
             self.zx *= -1
@@ -171,8 +201,55 @@ class Matrix(object):
     def normalize(self):
         raise NotImplementedError
 
+    def translation(self):  # type: () -> tuple
+        return self.px, self.py, self.pz
+
+    def eulerRotation(self):  # type: () -> tuple
+        """Rotation in degrees for maya's xyz rotate order, scale is ignored."""
+        rows = list()
+        for row in self.rows()[:3]:
+            length = math.sqrt(sum(v ** 2.0 for v in row[:3])) or 1.0
+            rows.append([v / length for v in row[:3]])
+
+        sinY = max(-1.0, min(1.0, -rows[0][2]))
+        y = math.asin(sinY)
+        if abs(sinY) < 1.0 - 1e-9:
+            x = math.atan2(rows[1][2], rows[2][2])
+            z = math.atan2(rows[0][1], rows[0][0])
+        else:  # gimbal lock, z folds into x
+            x = math.atan2(-rows[2][1], rows[1][1])
+            z = 0.0
+        return math.degrees(x), math.degrees(y), math.degrees(z)
+
+    def dot(self, other):  # type: (Matrix) -> Matrix
+        # full 4x4 product, self applied first (maya row-vector convention: local.dot(parentWorld) -> world)
+        a = self.aslist()
+        b = tuple(other)
+        return self.__class__(*(
+            a[row] * b[column] + a[row + 1] * b[column + 4] + a[row + 2] * b[column + 8] + a[row + 3] * b[column + 12]
+            for row in (0, 4, 8, 12)
+            for column in (0, 1, 2, 3)
+        ))
+
+    def inverse(self):  # type: () -> Matrix
+        # gauss-jordan elimination on [self | identity]
+        rows = [list(row) + [1.0 if r == c else 0.0 for c in range(4)] for r, row in enumerate(self.rows())]
+        for column in range(4):
+            pivot = max(range(column, 4), key=lambda r: abs(rows[r][column]))
+            if abs(rows[pivot][column]) < 1e-12:
+                raise ValueError('Matrix is not invertible -> {}'.format(self))
+            rows[column], rows[pivot] = rows[pivot], rows[column]
+            scale = rows[column][column]
+            rows[column] = [v / scale for v in rows[column]]
+            for r in range(4):
+                if r != column and rows[r][column]:
+                    factor = rows[r][column]
+                    rows[r] = [v - factor * p for v, p in zip(rows[r], rows[column])]
+        return self.__class__(*(v for row in rows for v in row[4:]))
+
     def __mul__(self, other):
-        if isinstance(other, self.__class__):
+        # frozen and editable matrices mix, the result has the type of self like dot and inverse
+        if isinstance(other, Matrix):
             newMatrix = list()
             for column in self.rows()[:3]:
                 for row in other.columns()[:3]:
@@ -194,6 +271,113 @@ class Matrix(object):
         )
 
 
+class MatrixArray(object):
+
+    size = 16
+
+    def __init__(self, matrices=None):  # type: (list) -> None
+        self.values = array.array('d')
+        for matrix in matrices or ():
+            self.append(matrix)
+
+    def __repr__(self):
+        return '<{}.{}: {} matrices>'.format(self.__class__.__module__, self.__class__.__name__, len(self))
+
+    def __len__(self):
+        return len(self.values) // self.size
+
+    def __getitem__(self, index):  # type: (int) -> Matrix
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('MatrixArray index out of range -> {}'.format(index))
+        return Matrix(*self.values[index * self.size:(index + 1) * self.size])
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def append(self, matrix):  # type: (Matrix) -> None
+        values = [float(v) for v in matrix]
+        if len(values) != self.size:
+            raise ValueError('Expected {} values per matrix, got {}'.format(self.size, len(values)))
+        self.values.extend(values)
+
+    def aslist(self):  # type: () -> list
+        return list(self)
+
+    def mirrored(self, mirrorAxis='x'):  # type: (basestring|Plane) -> MatrixArray
+        matrixArrayCopy = self.__class__()
+        matrixArrayCopy.values = array.array('d', self.values)
+        matrixArrayCopy.mirror(mirrorAxis)
+        return matrixArrayCopy
+
+    def mirror(self, mirrorAxis='x'):  # type: (basestring|Plane) -> None
+        plane = mirrorAxis if isinstance(mirrorAxis, Plane) else Plane.fromAxis(mirrorAxis)
+        plane.mirrorMatrixValues(self.values)
+
+
+class Plane(object):
+    """Mirror plane: every point p with normal . p == offset."""
+
+    axisNormals = {
+        'x': (1.0, 0.0, 0.0),
+        'y': (0.0, 1.0, 0.0),
+        'z': (0.0, 0.0, 1.0),
+    }
+
+    def __init__(self, normal=(1.0, 0.0, 0.0), offset=0.0):  # type: (Vector3, float) -> None
+        self.normal = Vector3(*normal).normalized()
+        self.offset = float(offset)
+
+    def __repr__(self):
+        return '<{}.{}: {}, {}>'.format(
+            self.__class__.__module__,
+            self.__class__.__name__,
+            self.normal.aslist(),
+            self.offset,
+        )
+
+    @classmethod
+    def fromAxis(cls, mirrorAxis='x'):  # type: (basestring) -> Plane
+        if mirrorAxis not in cls.axisNormals:
+            raise ValueError('Unrecognized mirror axis -> {}'.format(mirrorAxis))
+        return cls(cls.axisNormals[mirrorAxis])
+
+    @classmethod
+    def fromPoint(cls, normal, point):  # type: (Vector3, Position3) -> Plane
+        normal = Vector3(*normal).normalized()
+        return cls(normal, sum(n * p for n, p in zip(normal, point)))
+
+    def mirrorVector(self, vector):  # type: (list) -> tuple
+        nx, ny, nz = self.normal.aslist()
+        x, y, z = vector
+        distance = 2.0 * (x * nx + y * ny + z * nz)
+        return x - distance * nx, y - distance * ny, z - distance * nz
+
+    def mirrorPoint(self, point):  # type: (list) -> tuple
+        nx, ny, nz = self.normal.aslist()
+        x, y, z = point
+        distance = 2.0 * (x * nx + y * ny + z * nz - self.offset)
+        return x - distance * nx, y - distance * ny, z - distance * nz
+
+    def mirrorMatrixValues(self, values):  # type: (list) -> None
+        """
+        Mirror a flat sequence of row-major 4x4 matrices in place, in a single pass.
+        Axis rows are mirrored as directions, the position row as a point, like Matrix.mirror('x').
+        """
+        nx, ny, nz = self.normal.aslist()
+        offset = self.offset
+
+        for start in range(0, len(values), 16):
+            for row in (start, start + 4, start + 8, start + 12):
+                x, y, z = values[row], values[row + 1], values[row + 2]
+                distance = 2.0 * (x * nx + y * ny + z * nz - (offset if row == start + 12 else 0.0))
+                values[row] = x - distance * nx
+                values[row + 1] = y - distance * ny
+                values[row + 2] = z - distance * nz
+
+
 class Color(object):
 
     @classmethod
@@ -241,3 +425,103 @@ class Color(object):
                 str(type(other)),
             )
         )
+
+
+class Interned(object):
+    """
+    Mixin making a parameter type frozen and hashable, with one shared instance per value.
+    Instances are kept in a weak-valued cache, the most recently interned ones are also held
+    strongly so short-lived values are not rebuilt over and over.
+    Equal frozen values are the same object, so comparing and hashing them is O(1).
+    """
+
+    mutableType = None  # the parameter type this one freezes
+    cacheSize = 4096
+
+    cache = weakref.WeakValueDictionary()  # (class, values) -> instance
+    recent = collections.deque(maxlen=cacheSize)
+
+    def __new__(cls, *args, **kwargs):
+        values = tuple(cls.mutableType(*args, **kwargs).aslist())
+        key = cls, values
+
+        instance = cls.cache.get(key)
+        if instance is None:
+            instance = object.__new__(cls)
+            for name, value in zip(cls.valueNames(), values):
+                object.__setattr__(instance, name, value)
+            object.__setattr__(instance, '_key', key)
+            object.__setattr__(instance, '_hash', hash(key))
+            cls.cache[key] = instance
+
+        cls.recent.append(instance)
+        return instance
+
+    @classmethod
+    def interned(cls, value):  # type: (object) -> Interned
+        # skips the conversion of values that are interned already
+        return value if value.__class__ is cls else cls(*value)
+
+    @classmethod
+    def valueNames(cls):  # type: () -> tuple
+        raise NotImplementedError
+
+    def __init__(self, *args, **kwargs):
+        # built by __new__, which may hand back a shared instance
+        pass
+
+    def __setattr__(self, name, value):
+        raise AttributeError('{} is frozen, can not set {}'.format(self.__class__.__name__, name))
+
+    def __delattr__(self, name):
+        raise AttributeError('{} is frozen, can not delete {}'.format(self.__class__.__name__, name))
+
+    def __reduce__(self):
+        return self.__class__, tuple(self.aslist())
+
+    def __hash__(self):
+        return self._hash
+
+    def __eq__(self, other):
+        if other is self:
+            return True
+        if isinstance(other, Interned):
+            return False
+        return isinstance(other, self.mutableType) and tuple(other.aslist()) == self._key[1]
+
+    def __ne__(self, other):
+        return not self == other
+
+    def copy(self):
+        # an editable copy
+        return self.mutableType(*self.aslist())
+
+    def mirrored(self, mirrorAxis='x'):
+        return self.__class__(*self.mutableType.mirrored(self, mirrorAxis))
+
+
+class FrozenVector3(Interned, Vector3):
+
+    mutableType = Vector3
+
+    @classmethod
+    def valueNames(cls):  # type: () -> tuple
+        return 'x', 'y', 'z'
+
+
+class FrozenMatrix(Interned, Matrix):
+
+    mutableType = Matrix
+
+    @classmethod
+    def valueNames(cls):  # type: () -> tuple
+        return cls.attributeNames
+
+
+class FrozenColor(Interned, Color):
+
+    mutableType = Color
+
+    @classmethod
+    def valueNames(cls):  # type: () -> tuple
+        return 'r', 'g', 'b'
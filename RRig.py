@@ -1,11 +1,102 @@
-from . import RObj
-import rigBuilder as RBuild, RComp
-from maya import cmds
+import collections
+import json
+import time
+
+from . import RObj, RData, RComp, RScene, RParam
+from .RScene import cmds
+import rigBuilder as RBuild
+
+
+IndexEntry = collections.namedtuple(
+    'IndexEntry',
+    ('node', 'component', 'side', 'componentType', 'objType', 'name', 'index'),
+)
+
+
+class RigIndex(object):
+
+    fields = 'side', 'componentType', 'objType', 'name', 'index'
+
+    def __init__(self, components=None):  # type: (list) -> None
+        self.entries = list()
+        self.buckets = dict((field, collections.defaultdict(list)) for field in self.fields)
+
+        for component in RBuild.get(components, list()):
+            self.addComponent(component)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def addComponent(self, component):  # type: (RComp.RMayaComponent) -> None
+        # arrays are indexed as their folder plus their instances
+        instances = getattr(component, 'instances', None)
+        if instances:
+            objects = ((RComp.Config.componentTypeStr, (component.folder,)),)
+            for instance in instances:
+                self.addComponent(instance)
+        else:
+            objects = (
+                (RComp.Config.componentTypeStr, (component.folder,)),
+                (RComp.Config.controllerTypeStr, component.controllers),
+                (RComp.Config.skinJointTypeStr, component.skinJoints),
+            )
+
+        for objType, nodes in objects:
+            for node in nodes:
+                self.add(IndexEntry(
+                    node=str(node),
+                    component=component,
+                    side=component.side,
+                    componentType=component.__class__.__name__,
+                    objType=objType,
+                    name=component.name,
+                    index=component.index,
+                ))
+
+    def add(self, entry):  # type: (IndexEntry) -> None
+        self.entries.append(entry)
+        for field in self.fields:
+            self.buckets[field][getattr(entry, field)].append(entry)
+
+    def query(self, **filters):  # type: (...) -> list
+        """
+        Entries matching every filter, e.g. query(side='L', objType='ctl').
+        A filter value can be a list/tuple/set to match any of its values.
+        """
+        unknownFields = set(filters) - set(self.fields)
+        if unknownFields:
+            raise ValueError('Unrecognized query fields -> {}'.format(sorted(unknownFields)))
+
+        if not filters:
+            return list(self.entries)
+
+        filterValues = dict(
+            (field, value if isinstance(value, (list, tuple, set, frozenset)) else (value,))
+            for field, value in filters.items()
+        )
+
+        # walk the smallest bucket, sized without building it, and check the remaining filters on it
+        def bucketSize(field):
+            return sum(len(self.buckets[field].get(v, ())) for v in filterValues[field])
+
+        field = min(filterValues, key=bucketSize)
+        others = [(f, set(values)) for f, values in filterValues.items() if f != field]
+        return [
+            entry for v in filterValues[field] for entry in self.buckets[field].get(v, ())
+            if all(getattr(entry, f) in values for f, values in others)
+        ]
+
+
+BuildProgress = collections.namedtuple(
+    'BuildProgress',
+    ('step', 'total', 'phase', 'component', 'seconds', 'elapsed'),
+)
 
 
 class RRig(object):
 
     defaultName = 'rig'
+    connectionsAttr = 'connections'
 
     def __init__(self, name=None, components=None, connections=None):
         self.components = list(RBuild.get(components, list()))
@@ -14,20 +105,61 @@ class RRig(object):
         self.name = str(RBuild.get(name, self.defaultName))
 
         self.folder = None
+        self.rigIndex = None
+        self.transaction = None  # the BuildTransaction of a running iterCreate
+
+    def create(self, undo=RScene.BuildTransaction.chunkUndo):
+        # type: (str) -> None
+        # undo: 'suspend' skips undo recording, 'chunk' records the build as a single undo step, None records as usual
+        for _ in self.iterCreate(undo=undo):
+            pass
+
+    def iterCreate(self, undo=RScene.BuildTransaction.chunkUndo):
+        # type: (str) -> iter
+        """
+        Build step by step, yielding a BuildProgress after each component phase and connection.
+        Closing the generator before the end rolls the build back.
+        """
+        try:
+            with RScene.BuildTransaction(undo=undo, name=self.name) as self.transaction:
+                for progress in self._iterCreation():
+                    yield progress
+        except (Exception, GeneratorExit):
+            self.resetCreation()
+            raise
+        finally:
+            self.transaction = None
+
+        self.rigIndex = RigIndex(self.components)
+
+    def _iterCreation(self):
+        total = 1 + sum(len(c.creationPhases()) for c in self.components) + len(self.connections)
+        start = time.time()
+        step = [0]
+
+        def progress(phase, component, phaseStart):
+            step[0] += 1
+            now = time.time()
+            return BuildProgress(step[0], total, phase, component, now - phaseStart, now - start)
 
-    def create(self):
         # create folder
         self.folder = cmds.group(name=self.name, empty=True)
+        yield progress('folder', None, start)
 
         # Create and parent components
         for component in self.components:
-            component.create()
+            for phaseName, phase in component.creationPhases():
+                phaseStart = time.time()
+                phase()
+                yield progress(phaseName, component, phaseStart)
             cmds.parent(component.folder, self.folder)
 
         # Connect components
         for parentComponent, inputIndex, childComponent, outputIndex in self.connections:
+            phaseStart = time.time()
             try:
-                RObj.createMatrixConstraint((parentComponent.outputs[inputIndex],), childComponent.inputs[outputIndex])
+                parentOutput = parentComponent.outputs[inputIndex]
+                childInput = childComponent.inputs[outputIndex]
             except IndexError:
                 msg = 'impossible to make the connection: {}.outputs[{}] -> {}.inputs[{}]'.format(
                     parentComponent.folder,
@@ -36,3 +168,203 @@ class RRig(object):
                     outputIndex
                 )
                 raise IndexError(msg)
+
+            if childComponent.bufferless:
+                RObj.createOffsetParentConstraint(str(parentOutput), str(childInput))
+            else:
+                RObj.createMatrixConstraint((parentOutput,), childInput)
+            yield progress('connect', childComponent, phaseStart)
+
+        # store connections by folder so the rig can be rehydrated with fromScene
+        connectionsPlug = '{}.{}'.format(self.folder, self.connectionsAttr)
+        cmds.addAttr(self.folder, longName=self.connectionsAttr, dataType='string')
+        cmds.setAttr(connectionsPlug, json.dumps(self.asconnectiondata()), type='string')
+
+    def asconnectiondata(self):  # type: () -> list
+        return [
+            (parentComponent.folder, outputIndex, childComponent.folder, inputIndex)
+            for parentComponent, outputIndex, childComponent, inputIndex in self.connections
+        ]
+
+    @classmethod
+    def fromScene(cls, rootName):  # type: (str) -> RRig
+        rig = cls(name=rootName)
+        rig.folder = rootName
+
+        componentFolders = cmds.listRelatives(rootName, children=True, type='transform') or list()
+        rig.components = [RComp.RMayaComponent.fromScene(folder) for folder in componentFolders]
+
+        componentsByFolder = dict((component.folder, component) for component in rig.components)
+        connections = json.loads(cmds.getAttr('{}.{}'.format(rootName, cls.connectionsAttr)) or '[]')
+        rig.connections = [
+            (componentsByFolder[parentFolder], outputIndex, componentsByFolder[childFolder], inputIndex)
+            for parentFolder, outputIndex, childFolder, inputIndex in connections
+        ]
+
+        rig.rigIndex = RigIndex(rig.components)
+
+        return rig
+
+    def query(self, **filters):  # type: (...) -> list
+        if self.rigIndex is None:
+            raise RuntimeError('Rig is not built, create it or use fromScene -> {}'.format(self.name))
+        return [entry.node for entry in self.rigIndex.query(**filters)]
+
+    def createSelectionSet(self, name, **filters):  # type: (str, ...) -> str
+        return cmds.sets(self.query(**filters), name=name)
+
+    def resetCreation(self):
+        self.folder = None
+        self.rigIndex = None
+        for component in self.components:
+            component.resetCreation()
+
+    def mirror(self, plane=None, side=RComp.Config.leftSide):  # type: (RParam.Plane, str) -> list
+        """
+        Add a mirrored copy of every `side` component, and of the connections touching them.
+        All matrices are mirrored together in one pass, plane defaults to the yz plane.
+        """
+        plane = RParam.Plane.fromAxis('x') if plane is None else plane
+
+        sideTable = dict((s, m) for s, m in RComp.Config.sideMirrorTable.items() if m is not None)
+        if side not in sideTable:
+            raise ValueError('Side has no mirror -> {}'.format(side))
+
+        sources = [component for component in self.components if component.side == side]
+        datas = [component.asdict() for component in sources]
+
+        existing = set((c.__class__, c.name, c.side, c.index) for c in self.components)
+        for component in sources:
+            key = (component.__class__, component.name, sideTable[side], component.index)
+            if key in existing:
+                raise ValueError('Mirrored component already exists -> {}'.format(key))
+
+        # gather every matrix in one packed array: (data, key, kind, first, count)
+        matrices = RParam.MatrixArray()
+        slots = list()
+        for data in datas:
+            for key, value in data.items():
+                if isinstance(value, RParam.Matrix):
+                    slots.append((data, key, RParam.Matrix, len(matrices), 1))
+                    matrices.append(value)
+                elif isinstance(value, RParam.MatrixArray):
+                    slots.append((data, key, RParam.MatrixArray, len(matrices), len(value)))
+                    matrices.values.extend(value.values)
+                elif isinstance(value, (list, tuple)) and value and all(isinstance(v, RParam.Matrix) for v in value):
+                    slots.append((data, key, list, len(matrices), len(value)))
+                    for matrix in value:
+                        matrices.append(matrix)
+                elif isinstance(value, RParam.Vector3):
+                    data[key] = value.mirrored(plane)
+
+        matrices.mirror(plane)
+
+        for data, key, kind, first, count in slots:
+            if kind is RParam.Matrix:
+                data[key] = matrices[first]
+            elif kind is RParam.MatrixArray:
+                data[key] = RParam.MatrixArray()
+                data[key].values = matrices.values[first * 16:(first + count) * 16]
+            else:
+                data[key] = [matrices[index] for index in range(first, first + count)]
+
+        mirroredComponents = list()
+        for component, data in zip(sources, datas):
+            data['side'] = sideTable[side]
+            data['guides'] = list()
+            if component.hasSideColor():
+                data['ctrlColor'] = None  # the mirrored side gets its own color
+            if 'sides' in data:
+                data['sides'] = [sideTable.get(s, s) for s in data['sides']]
+            mirroredComponents.append(component.__class__(**data))
+
+        mirroredTable = dict((id(s), m) for s, m in zip(sources, mirroredComponents))
+        # only mirrored children get a connection, an unmirrored child keeps its single driver
+        mirroredConnections = [
+            (mirroredTable.get(id(parent), parent), outputIndex, mirroredTable[id(child)], inputIndex)
+            for parent, outputIndex, child, inputIndex in self.connections
+            if id(child) in mirroredTable
+        ]
+
+        self.components += mirroredComponents
+        self.connections += mirroredConnections
+
+        return mirroredComponents
+
+    def dump(self, path, binary=None, force=False):  # type: (str, bool, bool) -> None
+        RData.RigFile(path).dump(self.name, self.components, self.connections, binary=binary, force=force)
+
+    @classmethod
+    def load(cls, path):  # type: (str) -> RRig
+        rig = cls()
+
+        for kind, item in RData.RigFile(path).iterItems(RComp.getComponentTypes()):
+            if kind == 'component':
+                rig.components.append(item)
+            elif kind == 'connection':
+                rig.connections.append(item)
+            else:
+                rig.name = str(item.get('name') or cls.defaultName)
+
+        return rig
+
+
+class BuildDriver(object):
+    """
+    Runs RRig.iterCreate cooperatively: each tick advances the build until `budget` seconds are spent.
+    Between ticks the build transaction is paused, so the scene is left as it is for the user.
+    Use runIdle() inside Maya, or RAsync.runAsync(driver) from an asyncio loop.
+    """
+
+    def __init__(self, rig, budget=0.01, onProgress=None, undo=RScene.BuildTransaction.chunkUndo):
+        # type: (RRig, float, callable, str) -> None
+        self.rig = rig
+        self.budget = float(budget)
+        self.onProgress = onProgress
+
+        self.generator = rig.iterCreate(undo=undo)
+        self.progress = None
+        self.done = False
+        self.cancelled = False
+        self.error = None
+
+    def tick(self):  # type: () -> bool
+        if self.done:
+            return True
+
+        if self.rig.transaction is not None:
+            self.rig.transaction.resume()
+
+        deadline = time.time() + self.budget
+        try:
+            while True:
+                self.progress = next(self.generator)
+                if self.onProgress is not None:
+                    self.onProgress(self.progress)
+                if time.time() >= deadline:
+                    return False
+        except StopIteration:
+            self.done = True
+        except Exception as e:
+            self.done = True
+            self.error = e
+            raise
+        finally:
+            if not self.done and self.rig.transaction is not None:
+                self.rig.transaction.pause()
+
+        return True
+
+    def cancel(self):
+        if not self.done:
+            # the transaction inside iterCreate resumes and rolls back on GeneratorExit
+            self.generator.close()
+            self.done = True
+            self.cancelled = True
+
+    def runIdle(self):
+        def step():
+            if not self.tick():
+                cmds.evalDeferred(step, lowestPriority=True)
+
+        cmds.evalDeferred(step, lowestPriority=True)
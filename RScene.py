@@ -0,0 +1,471 @@
+import contextlib
+import importlib
+import re
+
+from . import RParam
+
+
+class LazyModule(object):
+
+    def __init__(self, name):  # type: (str) -> None
+        self.__dict__['name'] = name
+        self.__dict__['module'] = None
+        self.__dict__['observers'] = list()
+
+    def __repr__(self):
+        return '<{}.{}: {}>'.format(self.__class__.__module__, self.__class__.__name__, self.name)
+
+    def load(self):
+        if self.module is None:
+            self.__dict__['module'] = importlib.import_module(self.name)
+        return self.module
+
+    def setModule(self, module):
+        # swap the backing module, e.g. for RFakeScene.FakeCmds(); None restores the lazy import
+        self.__dict__['module'] = module
+
+    def addObserver(self, observer):
+        # observer(commandName, args, kwargs, result) is called after every command
+        self.observers.append(observer)
+
+    def removeObserver(self, observer):
+        self.observers.remove(observer)
+
+    def __getattr__(self, item):
+        attr = getattr(self.load(), item)
+        if not self.observers or not callable(attr):
+            return attr
+
+        observers = tuple(self.observers)
+
+        def observed(*args, **kwargs):
+            result = attr(*args, **kwargs)
+            for observer in observers:
+                observer(item, args, kwargs, result)
+            return result
+
+        return observed
+
+
+cmds = LazyModule('maya.cmds')
+
+
+class Journal(object):
+
+    creationCommands = (
+        'createNode',
+        'group',
+        'circle',
+        'spaceLocator',
+        'joint',
+        'parentConstraint',
+        'duplicate',
+        'sets',
+    )
+
+    def __init__(self):
+        self.nodes = list()
+        self.positions = dict()  # node -> position in self.nodes, keeps renames O(1)
+
+    def add(self, nodes):  # type: (list) -> None
+        for node in nodes:
+            self.positions[node] = len(self.nodes)
+            self.nodes.append(node)
+
+    def clear(self):
+        self.nodes = list()
+        self.positions = dict()
+
+    def __call__(self, command, args, kwargs, result):
+        if kwargs.get('query') or kwargs.get('q') or kwargs.get('edit') or kwargs.get('e'):
+            return
+
+        if command in self.creationCommands and result:
+            self.add(result if isinstance(result, (list, tuple)) else (result,))
+
+        elif command == 'controller':
+            # controller tags are created as a side effect and are not returned
+            for obj in args:
+                plug = '{}.message'.format(obj)
+                self.add(cmds.listConnections(plug, source=False, destination=True, type='controller') or [])
+
+        elif command == 'rename' and result:
+            position = self.positions.pop(str(args[0]).split('|')[-1], None)
+            if position is not None:
+                self.nodes[position] = result
+                self.positions[result] = position
+
+
+def shortName(node):  # type: (object) -> str
+    return str(node).split('|')[-1]
+
+
+def flatten(items):  # type: (object) -> list
+    if isinstance(items, (list, tuple)):
+        return [node for item in items for node in flatten(item)]
+    return [shortName(items)]
+
+
+class WorldMatrixCache(object):
+    """
+    World matrices known from the build's own writes, kept valid by observing scene commands.
+    Entries are dropped with their known descendants on xform, transform setAttr/connectAttr or relative reparent.
+    Entries whose ancestry is not fully known are dropped on every transform write.
+    Nodes created with an identity transform get their world matrix from the offsetParentMatrix written on them.
+    """
+
+    active = None
+
+    identity = tuple(RParam.Matrix().aslist())
+    transformAttrPattern = re.compile(
+        r'^([trs][xyz]?|translate\w*|rotate\w*|scale\w*|shear\w*|matrix|offsetParentMatrix|jointOrient\w*)$'
+    )
+    identityCommands = 'group', 'circle', 'spaceLocator', 'createNode'
+
+    def __init__(self):
+        self.world = dict()  # node -> world matrix
+        self.parents = dict()  # node -> parent (None for world), only for nodes with a known parent
+        self.children = dict()  # node -> set of known children
+        self.unknown = set()  # cached nodes whose ancestry is not fully known
+        self.identityLocal = set()  # nodes whose own transform is still the identity they were created with
+        self.offsetParents = dict()  # node -> offsetParentMatrix set by the build
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.world)
+
+    # queries
+
+    def get(self, node):  # type: (str) -> list
+        return self.getMany((node,))[0]
+
+    def getMany(self, nodes):  # type: (list) -> list
+        nodes = [shortName(node) for node in nodes]
+        missing = [node for node in nodes if node not in self.world]
+        self.hits += len(nodes) - len(missing)
+        self.misses += len(missing)
+
+        if missing:
+            values = cmds.xform(missing, query=True, matrix=True, worldSpace=True)
+            for position, node in enumerate(missing):
+                self.store(node, values[position * 16:(position + 1) * 16])
+
+        return [list(self.world[node]) for node in nodes]
+
+    def isKnown(self, node):  # type: (str) -> bool
+        while node is not None:
+            if node not in self.parents:
+                return False
+            node = self.parents[node]
+        return True
+
+    # bookkeeping
+
+    def store(self, node, matrix):  # type: (str, list) -> None
+        self.world[node] = tuple(float(v) for v in matrix)
+        if self.isKnown(node):
+            self.unknown.discard(node)
+        else:
+            self.unknown.add(node)
+
+    def setParent(self, node, parent):  # type: (str, str) -> None
+        previous = self.parents.get(node)
+        if previous is not None and previous in self.children:
+            self.children[previous].discard(node)
+        self.parents[node] = parent
+        if parent is not None:
+            self.children.setdefault(parent, set()).add(node)
+
+        if not self.isKnown(node):
+            for each in [node] + self.descendants(node):
+                if each in self.world:
+                    self.unknown.add(each)
+
+    def descendants(self, node):  # type: (str) -> list
+        result = list()
+        stack = list(self.children.get(node, ()))
+        while stack:
+            child = stack.pop()
+            result.append(child)
+            stack.extend(self.children.get(child, ()))
+        return result
+
+    def invalidate(self, node):  # type: (str) -> None
+        for each in [node] + self.descendants(node):
+            self.world.pop(each, None)
+
+        # anything cached under an unknown ancestor may have moved too
+        for each in self.unknown:
+            self.world.pop(each, None)
+        self.unknown = set()
+
+    def storeOffsetParented(self, node):  # type: (str) -> None
+        # world = offsetParentMatrix * parent world, for a node with an identity transform
+        if node not in self.identityLocal or node not in self.offsetParents:
+            return
+        parent = self.parents.get(node, False)
+        if parent is None:
+            self.store(node, self.offsetParents[node])
+        elif parent and parent in self.world:
+            matrix = RParam.Matrix(*self.offsetParents[node]).dot(RParam.Matrix(*self.world[parent]))
+            self.store(node, matrix.aslist())
+
+    def snapshot(self, node):  # type: (str) -> dict
+        return dict((each, self.world[each]) for each in [node] + self.descendants(node) if each in self.world)
+
+    def forget(self, node):  # type: (str) -> None
+        for each in [node] + self.descendants(node):
+            self.world.pop(each, None)
+            self.unknown.discard(each)
+            self.identityLocal.discard(each)
+            self.offsetParents.pop(each, None)
+            parent = self.parents.pop(each, None)
+            if parent is not None and parent in self.children:
+                self.children[parent].discard(each)
+            self.children.pop(each, None)
+
+    def rename(self, old, new):  # type: (str, str) -> None
+        if old in self.world:
+            self.world[new] = self.world.pop(old)
+        for names in (self.unknown, self.identityLocal):
+            if old in names:
+                names.discard(old)
+                names.add(new)
+        if old in self.offsetParents:
+            self.offsetParents[new] = self.offsetParents.pop(old)
+        if old in self.parents:
+            parent = self.parents.pop(old)
+            self.parents[new] = parent
+            if parent is not None and parent in self.children:
+                self.children[parent].discard(old)
+                self.children[parent].add(new)
+        if old in self.children:
+            self.children[new] = self.children.pop(old)
+            for child in self.children[new]:
+                self.parents[child] = new
+
+    def clear(self):
+        self.__init__()
+
+    # observer
+
+    def __call__(self, command, args, kwargs, result):
+        if kwargs.get('query') or kwargs.get('q'):
+            return
+
+        if command in self.identityCommands and result:
+            node = shortName(result[0] if isinstance(result, (list, tuple)) else result)
+            parent = kwargs.get('parent', kwargs.get('p'))
+            if command == 'group' and not kwargs.get('empty', kwargs.get('em')):
+                return
+            self.setParent(node, None if parent is None else shortName(parent))
+            self.identityLocal.add(node)
+            if parent is None:
+                self.store(node, self.identity)
+            elif shortName(parent) in self.world:
+                self.store(node, self.world[shortName(parent)])
+
+        elif command == 'xform':
+            matrix = kwargs.get('matrix', kwargs.get('m'))
+            worldSpace = kwargs.get('worldSpace', kwargs.get('ws'))
+            for node in flatten(args):
+                self.invalidate(node)
+                self.identityLocal.discard(node)
+                if matrix is None:
+                    continue
+                parent = self.parents.get(node, False)
+                if worldSpace or parent is None:
+                    self.store(node, matrix)
+                elif parent and parent in self.world:
+                    local = RParam.Matrix(*matrix)
+                    self.store(node, local.dot(RParam.Matrix(*self.world[parent])).aslist())
+
+        elif command in ('setAttr', 'connectAttr'):
+            plug = str(args[-1] if command == 'connectAttr' else args[0])
+            node, _, attr = plug.partition('.')
+            node = shortName(node)
+            if self.transformAttrPattern.match(attr.split('[')[0]):
+                self.invalidate(node)
+                if attr != 'offsetParentMatrix':
+                    self.identityLocal.discard(node)
+                    return
+                self.offsetParents.pop(node, None)
+                if command == 'setAttr' and len(args) > 1 and kwargs.get('type') == 'matrix':
+                    self.offsetParents[node] = tuple(float(v) for v in args[1])
+                    self.storeOffsetParented(node)
+
+        elif command == 'setPlacements':
+            nodes, matrices = args[:2]
+            for node, matrix in zip(nodes, matrices):
+                node = shortName(node)
+                self.invalidate(node)
+                if kwargs.get('offsetParent'):
+                    self.offsetParents[node] = tuple(float(v) for v in matrix)
+                    self.storeOffsetParented(node)
+                else:
+                    self.identityLocal.discard(node)
+                    self.store(node, matrix)
+
+        elif command == 'parentConstraint':
+            self.invalidate(flatten(args)[-1])
+
+        elif command == 'parent':
+            items = flatten(args)
+            if kwargs.get('world') or kwargs.get('w'):
+                children, parent = items, None
+            else:
+                children, parent = items[:-1], items[-1]
+            for child in children:
+                if kwargs.get('relative') or kwargs.get('r'):
+                    self.invalidate(child)
+                    self.setParent(child, parent)
+                    self.storeOffsetParented(child)
+                else:
+                    # the world matrix is kept by changing the node's own transform
+                    self.identityLocal.discard(child)
+                    self.setParent(child, parent)
+
+        elif command == 'rename' and result:
+            self.rename(shortName(args[0]), shortName(result))
+
+        elif command == 'delete':
+            for node in flatten(args):
+                self.forget(node)
+
+        elif command == 'file' and (kwargs.get('new') or kwargs.get('open') or kwargs.get('o')):
+            self.clear()
+
+
+def getWorldMatrices(nodes):  # type: (list) -> list
+    """World matrices of many nodes, served by the active build cache or one bulk query."""
+    if WorldMatrixCache.active is not None:
+        return WorldMatrixCache.active.getMany(nodes)
+
+    nodes = list(nodes)
+    if not nodes:
+        return list()
+    values = cmds.xform(nodes, query=True, matrix=True, worldSpace=True)
+    return [values[position * 16:(position + 1) * 16] for position in range(len(nodes))]
+
+
+def getWorldMatrix(node):  # type: (str) -> list
+    return getWorldMatrices((node,))[0]
+
+
+def setPlacements(nodes, matrices, offsetParent=False):  # type: (list, list, bool) -> None
+    """
+    World matrices of many top level nodes, written to their offsetParentMatrix when `offsetParent`.
+    Backends with a bulk setPlacements command (RFakeScene) take them in one call, maya.cmds one command per node.
+    """
+    nodes = [str(node) for node in nodes]
+    matrices = [list(matrix) for matrix in matrices]
+    if not nodes:
+        return
+
+    try:
+        bulk = cmds.setPlacements
+    except AttributeError:
+        bulk = None
+
+    if bulk is not None:
+        bulk(nodes, matrices, offsetParent=offsetParent)
+    elif offsetParent:
+        for node, matrix in zip(nodes, matrices):
+            cmds.setAttr('{}.offsetParentMatrix'.format(node), matrix, type='matrix')
+    else:
+        for node, matrix in zip(nodes, matrices):
+            cmds.xform(node, matrix=matrix, worldSpace=True)
+
+
+@contextlib.contextmanager
+def keepingWorldMatrices(node):  # type: (str) -> None
+    """For edits known to leave node in place: the cached world matrices of node and its children survive them."""
+    cache = WorldMatrixCache.active
+    kept = cache.snapshot(shortName(node)) if cache is not None else dict()
+    yield
+    for each, matrix in kept.items():
+        cache.store(each, matrix)
+
+
+class BuildTransaction(object):
+    """
+    Context manager journaling every node created through RScene.cmds.
+    When the block raises, exactly the journaled nodes are deleted.
+    Undo is recorded as one chunk by default, 'suspend' turns it off and flushes the queue.
+    """
+
+    suspendUndo = 'suspend'
+    chunkUndo = 'chunk'
+    recordUndo = None
+
+    def __init__(self, undo=chunkUndo, name='rigBuild'):  # type: (str, str) -> None
+        if undo not in (self.suspendUndo, self.chunkUndo, self.recordUndo):
+            raise ValueError('Unrecognized undo mode -> {}'.format(undo))
+
+        self.undo = undo
+        self.name = name
+        self.journal = Journal()
+        self.matrixCache = WorldMatrixCache()
+        self.previousMatrixCache = None
+        self.undoState = None
+        self.paused = False
+
+    def __enter__(self):
+        self.arm()
+        return self
+
+    def __exit__(self, excType, excValue, tb):
+        if self.paused:
+            self.paused = False
+            self.arm()
+
+        try:
+            if excType is not None:
+                self.rollback()
+        finally:
+            self.disarm()
+
+        return False
+
+    def arm(self):
+        if self.undo == self.suspendUndo:
+            self.undoState = cmds.undoInfo(query=True, state=True)
+            # stateWithoutFlush would leave a queue that destructive commands can corrupt
+            cmds.undoInfo(state=False)
+        elif self.undo == self.chunkUndo:
+            cmds.undoInfo(openChunk=True, chunkName=self.name)
+
+        cmds.addObserver(self.journal)
+        cmds.addObserver(self.matrixCache)
+        self.previousMatrixCache, WorldMatrixCache.active = WorldMatrixCache.active, self.matrixCache
+
+    def disarm(self):
+        cmds.removeObserver(self.journal)
+        cmds.removeObserver(self.matrixCache)
+        WorldMatrixCache.active = self.previousMatrixCache
+
+        if self.undo == self.suspendUndo:
+            cmds.undoInfo(state=self.undoState)
+        elif self.undo == self.chunkUndo:
+            cmds.undoInfo(closeChunk=True)
+
+    def pause(self):
+        """Hand the scene back between steps of an interactive build: undo, journal and cache are off."""
+        if not self.paused:
+            self.paused = True
+            self.disarm()
+
+    def resume(self):
+        if self.paused:
+            self.paused = False
+            # the scene may have been edited while paused
+            self.matrixCache.clear()
+            self.arm()
+
+    def rollback(self):
+        # ls with an empty list would return the whole scene
+        existingNodes = cmds.ls(list(reversed(self.journal.nodes))) if self.journal.nodes else None
+        if existingNodes:
+            cmds.delete(existingNodes)
+        self.journal.clear()
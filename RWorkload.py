@@ -0,0 +1,113 @@
+import collections
+import math
+import random
+
+from . import RComp
+from . import RData
+from . import RParam
+from . import RRig
+
+
+class WorkloadGenerator(object):
+    """
+    Seeded random rig descriptions: one base component, then ctrls and fk chains
+    hanging from the outputs of earlier components. Guides are named after the component
+    they place, so the guide data can be dumped as a MatrixFile and read back.
+    """
+
+    def __init__(self, seed=0, chainLength=(2, 5), fanOut=4, mirror=0.5, weights=None, spread=50.0):
+        # type: (int, tuple, int, float, dict, float) -> None
+        self.seed = seed
+        self.chainLength = chainLength  # inclusive min and max number of fk ctrls
+        self.fanOut = max(1, int(fanOut))  # max connections driven by one output
+        self.mirror = mirror  # chance for a left component to get a mirrored right twin
+        self.weights = dict(weights or {'RCtrlComponent': 1.0, 'RFkChainComponent': 1.0})
+        self.spread = spread
+
+    def randomMatrix(self, rand, origin=None):  # type: (random.Random, tuple) -> RParam.Matrix
+        angle = rand.uniform(-math.pi, math.pi)
+        cos, sin = math.cos(angle), math.sin(angle)
+        x, y, z = origin or (
+            rand.uniform(.5, 1.0) * self.spread,
+            rand.uniform(0.0, self.spread),
+            rand.uniform(-1.0, 1.0) * self.spread,
+        )
+        return RParam.Matrix(
+            cos, sin, 0.0, 0.0,
+            -sin, cos, 0.0, 0.0,
+            0.0, 0.0, 1.0, 0.0,
+            x, y, z, 1.0,
+        )
+
+    def pickType(self, rand):  # type: (random.Random) -> str
+        typeNames = sorted(self.weights)
+        pick = rand.uniform(0.0, sum(self.weights[typeName] for typeName in typeNames))
+        for typeName in typeNames:
+            pick -= self.weights[typeName]
+            if pick <= 0.0:
+                return typeName
+        return typeNames[-1]
+
+    def generate(self, count, name='synthetic'):  # type: (int, str) -> tuple
+        """Return a rig of about `count` components (mirroring may add one) and its guide data."""
+        rand = random.Random(self.seed)
+        guides = collections.OrderedDict()
+
+        base = RComp.RBaseComponent(ctrlSize=10.0)
+        components = [base]
+        connections = list()
+        # free output slots: [component, outputIndex, remaining fan-out]
+        slots = [[base, index, self.fanOut] for index in range(base.objectCounts()['outputs'])]
+        mirrors = dict()  # left component -> right twin
+
+        indices = collections.Counter()
+
+        while len(components) < count and slots:
+            typeName = self.pickType(rand)
+
+            # connect to a random output that can still drive more inputs,
+            # a mirrored pair driven from a center output takes two of its slots
+            slot = rand.choice(slots)
+            parent, outputIndex = slot[0], slot[1]
+            mirrored = rand.random() < self.mirror and (parent in mirrors or slot[2] > 1)
+            slot[2] -= 2 if mirrored and parent not in mirrors else 1
+            if slot[2] <= 0:
+                slots.remove(slot)
+
+            side = RComp.Config.leftSide if mirrored else RComp.Config.centerSide
+            index = indices[typeName]
+            indices[typeName] += 1
+
+            if typeName == 'RFkChainComponent':
+                length = rand.randint(*self.chainLength)
+                root = self.randomMatrix(rand)
+                matrices = [root]
+                for _ in range(length - 1):
+                    previous = matrices[-1].aslist()
+                    matrices.append(self.randomMatrix(rand, (previous[12] + 5.0, previous[13], previous[14])))
+                guideNames = ['chain{}_{}'.format(index, position) for position in range(length)]
+                component = RComp.RFkChainComponent(matrices=matrices, side=side, index=index, guides=guideNames)
+            else:
+                matrices = [self.randomMatrix(rand)]
+                guideNames = ['ctrl{}'.format(index)]
+                component = RComp.RCtrlComponent(matrix=matrices[0], side=side, index=index, guides=guideNames)
+
+            guides.update(zip(guideNames, (list(m.aslist()) for m in matrices)))
+
+            components.append(component)
+            connections.append((parent, outputIndex, component, 0))
+            slots += [[component, i, self.fanOut] for i in range(component.objectCounts()['outputs'])]
+
+            if mirrored:
+                twin = component.mirrored()
+                mirrors[component] = twin
+                components.append(twin)
+                # twins are only driven by the twins of their left component's children
+                connections.append((mirrors.get(parent, parent), outputIndex, twin, 0))
+
+        return RRig.RRig(name=name, components=components, connections=connections), guides
+
+    def dumpGuides(self, guides, path, force=True):  # type: (dict, str, bool) -> RData.MatrixFile
+        matrixFile = RData.MatrixFile(path)
+        matrixFile.dump(guides, force=force)
+        return matrixFile
@@ -1,10 +1,34 @@
-from maya import cmds
-from . import RData, RComp, RObj, RRig
-import rigBuilder as RBuild
+import importlib
+
+# submodules and aliases resolved on first attribute access (PEP 562)
+lazyModules = ('RParam', 'RScene', 'RFakeScene', 'RData', 'RObj', 'RComp', 'RRig', 'RLive', 'RCost', 'RBatch', 'RBench', 'RWorkload', 'RAsync')
+lazyAliases = {
+    'RBuild': 'rigBuilder',
+}
+
+
+def __getattr__(name):
+    if name in lazyModules:
+        module = importlib.import_module('.{}'.format(name), __name__)
+    elif name in lazyAliases:
+        module = importlib.import_module(lazyAliases[name])
+    elif name == 'cmds':
+        from .RScene import cmds as module
+    else:
+        raise AttributeError('module {!r} has no attribute {!r}'.format(__name__, name))
+
+    globals()[name] = module
+    return module
+
+
+def __dir__():
+    return sorted(set(globals()) | set(lazyModules) | set(lazyAliases) | {'cmds'})
 
 
 def test():
     import os
+    from . import RData, RComp, RRig
+    from .RScene import cmds
 
     # Matrix Data
     # Data path
@@ -31,18 +55,14 @@ def test():
     l_chainComp = RComp.RFkChainComponent(matrices=chainMatrices, side=RComp.Config.leftSide)
     r_chainComp = l_chainComp.mirrored()
 
-    # Connections
+    # Connections: (parent, output index, child, input index), made by the rig once every component is built
     connections = [
-        (baseComponent, 'worldOutput', l_ctrlComp, 'input'),
-        (baseComponent, 'worldOutput', r_ctrlComp, 'input'),
-        (l_ctrlComp, 'output', l_chainComp, 'input'),
-        (r_ctrlComp, 'output', r_chainComp, 'input'),
+        (baseComponent, 1, l_ctrlComp, 0),
+        (baseComponent, 1, r_ctrlComp, 0),
+        (l_ctrlComp, 0, l_chainComp, 0),
+        (r_ctrlComp, 0, r_chainComp, 0),
     ]
 
-    RObj.createMatrixConstraint((baseComponent.outputs[1],), l_ctrlComp.inputs[0])
-    RObj.createMatrixConstraint((baseComponent.outputs[1],), r_ctrlComp.inputs[0])
-    RObj.createMatrixConstraint((r_ctrlComp.outputs[0],), r_ctrlComp.inputs[0])
-
     components = [
         baseComponent,
         l_ctrlComp,